@@ -0,0 +1,28 @@
+"""product images gin index
+
+Revision ID: a7c4e2f9b1d3
+Revises: f3b9d6a1c8e2
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e2f9b1d3'
+down_revision: Union[str, None] = 'f3b9d6a1c8e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Referensi blob gambar dihitung dengan `images && ARRAY[...]` (GC storage)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_images', 'products', ['images'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_images', table_name='products', postgresql_concurrently=True, if_exists=True)
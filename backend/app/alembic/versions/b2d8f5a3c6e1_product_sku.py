@@ -0,0 +1,31 @@
+"""product sku
+
+Revision ID: b2d8f5a3c6e1
+Revises: a7c4e2f9b1d3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d8f5a3c6e1'
+down_revision: Union[str, None] = 'a7c4e2f9b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('sku', sa.String(length=100), nullable=True))
+    # Key upsert import massal (INSERT ... ON CONFLICT (sku))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_products_sku', 'products', ['sku'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_products_sku', table_name='products', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('products', 'sku')
@@ -0,0 +1,58 @@
+"""stock reservations
+
+Revision ID: c9e3a7d1f4b2
+Revises: b2d8f5a3c6e1
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e3a7d1f4b2'
+down_revision: Union[str, None] = 'b2d8f5a3c6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stock_reservations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), server_default='active', nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_stock_reservations_user_id', 'stock_reservations', ['user_id'])
+    # Sweeper hanya memindai reservasi aktif yang lewat waktu
+    op.create_index(
+        'ix_stock_reservations_active_expires_at', 'stock_reservations', ['expires_at'],
+        postgresql_where=sa.text("status = 'active'"),
+    )
+    op.create_table(
+        'stock_reservation_items',
+        sa.Column('reservation_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.CheckConstraint('quantity > 0', name='ck_stock_reservation_items_quantity'),
+        sa.ForeignKeyConstraint(['reservation_id'], ['stock_reservations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('reservation_id', 'product_id'),
+    )
+    op.create_index('ix_stock_reservation_items_product_id', 'stock_reservation_items', ['product_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_reservation_items_product_id', table_name='stock_reservation_items')
+    op.drop_table('stock_reservation_items')
+    op.drop_index('ix_stock_reservations_active_expires_at', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_user_id', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
@@ -0,0 +1,37 @@
+"""product filter indexes
+
+Revision ID: e1a4b8c3d2f5
+Revises: c7d2e91f4a10
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a4b8c3d2f5'
+down_revision: Union[str, None] = 'c7d2e91f4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_products_category_status_price': ['category', 'status', 'price'],
+    'ix_products_status_created_at': ['status', 'created_at', 'id'],
+    'ix_products_created_at_id': ['created_at', 'id'],
+    'ix_products_price_id': ['price', 'id'],
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY supaya tabel products tidak terkunci selama index dibangun
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(name, 'products', columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name='products', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,27 @@
+"""user token version
+
+Revision ID: f3b9d6a1c8e2
+Revises: e1a4b8c3d2f5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9d6a1c8e2'
+down_revision: Union[str, None] = 'e1a4b8c3d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server_default '0' cocok dengan token lama tanpa klaim `ver`
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -1,9 +1,54 @@
 from fastapi import APIRouter, Depends
 from app.core.rbac import require_role
-from app.models.user import User
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.jwt import token_cache_stats
+from app.core.pool import pool_status
+from app.core.request_logging import logging_stats
+from app.core.sql_profiler import recent_profiles
+from app.core.storage import collect_garbage
+from app.core.security import password_hasher
+from app.core.principal import AuthPrincipal
+from app.schemas.response import SuccessResponse
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/dashboard")
-def admin_dashboard(current_user: User = Depends(require_role("admin"))):
+async def admin_dashboard(current_user: AuthPrincipal = Depends(require_role("admin"))):
     return {"message": f"Welcome admin {current_user.email}!"}
+
+
+@router.get("/db/pool", response_model=SuccessResponse)
+async def db_pool_metrics(current_user: AuthPrincipal = Depends(require_role("admin"))):
+    """Status connection pool worker ini (checked-out, overflow, waktu tunggu, timeout)."""
+    return SuccessResponse(data=pool_status(async_engine, settings))
+
+
+@router.get("/password-hashing", response_model=SuccessResponse)
+async def password_hashing_metrics(current_user: AuthPrincipal = Depends(require_role("admin"))):
+    """Antrean dan durasi bcrypt di worker ini."""
+    return SuccessResponse(data=password_hasher.stats())
+
+
+@router.get("/auth/token-cache", response_model=SuccessResponse)
+async def token_cache_metrics(current_user: AuthPrincipal = Depends(require_role("admin"))):
+    """Hit/miss cache verifikasi JWT di worker ini."""
+    return SuccessResponse(data=token_cache_stats())
+
+
+@router.post("/storage/gc", response_model=SuccessResponse)
+async def storage_gc(current_user: AuthPrincipal = Depends(require_role("admin"))):
+    """Jalankan sweep blob upload yang tidak direferensikan produk mana pun sekarang."""
+    return SuccessResponse(data=await collect_garbage())
+
+
+@router.get("/logging", response_model=SuccessResponse)
+async def logging_metrics(current_user: AuthPrincipal = Depends(require_role("admin"))):
+    """Kedalaman antrean log dan record yang dibuang karena antrean penuh."""
+    return SuccessResponse(data=logging_stats())
+
+
+@router.get("/sql-profiles", response_model=SuccessResponse)
+async def sql_profiles(current_user: AuthPrincipal = Depends(require_role("admin"))):
+    """Laporan profiler SQL terakhir di worker ini (terbaru dulu)."""
+    return SuccessResponse(data=list(reversed(recent_profiles)))
@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Depends, Response, Request, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from datetime import timedelta, datetime
 from jose import jwt, JWTError
 from app.core.database import get_db
 from app.models.user import User
-from app.core.security import verify_password, get_password_hash
+from app.core.security import verify_password_async, hash_password_async, needs_rehash
+from app.core.dependencies import get_current_user
+from app.core.principal import AuthPrincipal, access_claims, revoke_tokens
+from app.core.rate_limit import login_email_limit, login_ip_limit, register_ip_limit
 from app.schemas.response import SuccessResponse
 from app.schemas.user import UserCreate, UserOut, LoginPayload  # pastikan schema ini ada
 from app.core.config import settings
@@ -27,21 +32,21 @@ def create_token(data: dict, secret: str, expires_delta: timedelta):
 # ===========================================================
 # 🔐 REGISTER
 # ===========================================================
-@router.post("/register", response_model=SuccessResponse)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", response_model=SuccessResponse, dependencies=[Depends(register_ip_limit.by_ip)])
+async def register_user(payload: UserCreate, db: AsyncSession = Depends(get_db)):
     """Mendaftarkan user baru."""
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = (await db.execute(select(User.id).where(User.email == payload.email))).scalar_one_or_none()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = User(
         email=payload.email,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=await hash_password_async(payload.password),
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return success(UserOut.model_validate(new_user))
 
@@ -49,27 +54,40 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)):
 # ===========================================================
 # 🔑 LOGIN
 # ===========================================================
-@router.post("/login", response_model=SuccessResponse)
-def login(payload: LoginPayload, response: Response, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+@router.post("/login", response_model=SuccessResponse, dependencies=[Depends(login_ip_limit.by_ip)])
+async def login(payload: LoginPayload, response: Response, db: AsyncSession = Depends(get_db)):
+    # dibatasi sebelum query & bcrypt: burst credential stuffing tidak menghabiskan CPU
+    await login_email_limit.check(payload.email.lower())
+
+    user = (await db.execute(
+        select(User).options(joinedload(User.role)).where(User.email == payload.email)
+    )).scalar_one_or_none()
 
     # (opsional) guard untuk bcrypt 72 bytes
     if len(payload.password.encode("utf-8")) > 72:
         raise HTTPException(status_code=400, detail="Password too long (max 72 bytes)")
 
-    if not user or not verify_password(payload.password, user.hashed_password):
+    # bcrypt berat di CPU: dijalankan di executor khusus, bukan di event loop
+    if not user or not await verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    role_name = user.role.name if getattr(user, "role", None) else "user"
+    # Hash dengan cost lama (BCRYPT_ROUNDS dinaikkan) diperbarui saat password diketahui benar
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(payload.password)
+        await db.commit()
+
+    if not user.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
 
+    # klaim cukup untuk membangun AuthPrincipal tanpa memuat ulang user per request
     access_token = create_token(
-        {"sub": str(user.id), "email": user.email, "role": role_name},
+        access_claims(user),
         settings.ACCESS_SECRET,
         timedelta(minutes=settings.ACCESS_EXPIRE_MINUTES),
     )
 
     refresh_token = create_token(
-        {"sub": str(user.id)},
+        {"sub": str(user.id), "ver": user.token_version},
         settings.REFRESH_SECRET,
         timedelta(days=settings.REFRESH_EXPIRE_DAYS),
     )
@@ -93,7 +111,7 @@ def login(payload: LoginPayload, response: Response, db: Session = Depends(get_d
 # 🔄 REFRESH TOKEN
 # ===========================================================
 @router.post("/refresh", response_model=SuccessResponse)
-def refresh_token(request: Request, db: Session = Depends(get_db)):
+async def refresh_token(request: Request, db: AsyncSession = Depends(get_db)):
     """Menerbitkan ulang access token baru dari refresh token cookie."""
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
@@ -106,17 +124,36 @@ def refresh_token(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
     # Ambil ulang data user untuk memuat role terbaru
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(
+        select(User).options(joinedload(User.role)).where(User.id == user_id)
+    )).scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    role_name = user.role.name if getattr(user, "role", None) else "user"
+    # refresh token yang terbit sebelum logout-all ikut dicabut
+    if not user.is_active or payload.get("ver", 0) != user.token_version:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
     # ✅ Sekarang access token baru juga punya field role
     new_access = create_token(
-        {"sub": str(user.id), "email": user.email, "role": role_name},
+        access_claims(user),
         settings.ACCESS_SECRET,
         timedelta(minutes=settings.ACCESS_EXPIRE_MINUTES),
     )
 
     return success({"access_token": new_access})
+
+
+# ===========================================================
+# 🚪 LOGOUT DARI SEMUA PERANGKAT
+# ===========================================================
+@router.post("/logout-all", response_model=SuccessResponse)
+async def logout_all(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    """Mencabut semua access/refresh token user dengan menaikkan token_version."""
+    await revoke_tokens(db, current_user.id)
+    response.delete_cookie(key="refresh_token", path="/")
+    return success({"revoked": True})
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.instrumentation import metrics_text
+
+router = APIRouter(tags=["metrics"])
+
+
+# 📈 Prometheus scrape endpoint (taruh di balik jaringan internal / reverse proxy)
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    # mode multi-worker membaca file snapshot → jangan di event loop
+    body = await run_in_threadpool(metrics_text)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
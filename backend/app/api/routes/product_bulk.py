@@ -0,0 +1,123 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.catalog import products_changed
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.principal import AuthPrincipal
+from app.core.product_batch import batch_update, filter_update
+from app.core.product_import import (
+    csv_records, export_csv, export_ndjson, import_products, iter_lines, ndjson_records,
+)
+from app.schemas.product import ProductBatchUpdate, ProductFilterUpdate
+from app.schemas.response import SuccessResponse
+
+# Didaftarkan sebelum router products supaya /products/export tidak tertangkap /{product_id}
+router = APIRouter(prefix="/products", tags=["products"])
+
+CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def success(data):
+    return SuccessResponse(data=data)
+
+
+def _detect_format(request: Request, format: Optional[str]) -> str:
+    if format:
+        return format
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    raise HTTPException(status_code=400, detail="Cannot detect import format; use ?format=ndjson|csv or a matching Content-Type")
+
+
+# ===========================================================
+# 📥 BULK IMPORT (NDJSON / CSV)
+# ===========================================================
+@router.post("/import", response_model=SuccessResponse)
+async def import_products_endpoint(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="ndjson | csv (default: dari Content-Type)"),
+    on_conflict: str = Query("update", pattern="^(update|skip)$", description="SKU sudah ada: update | skip"),
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    """
+    Upsert massal berdasarkan `sku`. Body dibaca streaming dan ditulis per batch
+    (IMPORT_BATCH_SIZE baris per INSERT ... ON CONFLICT); baris yang gagal
+    validasi dilaporkan per nomor baris tanpa membatalkan baris lain.
+    """
+    format = _detect_format(request, format)
+    lines = iter_lines(request.stream())
+    records = csv_records(lines) if format == "csv" else ndjson_records(lines)
+    report = await import_products(
+        db, records, current_user.id, on_conflict,
+        batch_size=settings.IMPORT_BATCH_SIZE, max_errors=settings.IMPORT_MAX_ERRORS,
+    )
+
+    if report["inserted"] or report["updated"]:
+        await products_changed()
+    return success(report)
+
+
+# ===========================================================
+# 📤 BULK EXPORT (streaming)
+# ===========================================================
+@router.get("/export")
+async def export_products_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    """Seluruh katalog, dialirkan per batch dari server-side cursor."""
+    body = export_csv(settings.EXPORT_BATCH_SIZE) if format == "csv" else export_ndjson(settings.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        body,
+        media_type=CONTENT_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+# ===========================================================
+# ✏️ BATCH UPDATE (per item / per filter)
+# ===========================================================
+@router.patch("/batch", response_model=SuccessResponse)
+async def batch_update_products(
+    payload: ProductBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    """
+    Update parsial banyak produk dalam satu transaksi. Item dengan kombinasi
+    field yang sama ditulis dengan satu UPDATE ... FROM (VALUES ...).
+    """
+    outcomes = await batch_update(db, payload.items)
+    await db.commit()
+
+    summary = {status: sum(1 for o in outcomes if o["status"] == status) for status in ("updated", "not_found", "invalid")}
+    if summary["updated"]:
+        await products_changed()
+    return success({**summary, "items": outcomes})
+
+
+@router.patch("/batch/filter", response_model=SuccessResponse)
+async def filter_update_products(
+    payload: ProductFilterUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    """Update semua produk yang cocok dengan `filters` (grammar sama dengan /products/search)."""
+    if not payload.set.model_fields_set:
+        raise HTTPException(status_code=400, detail="Nothing to update: `set` is empty")
+
+    updated = await filter_update(db, payload.filters, payload.set)
+    await db.commit()
+
+    if updated:
+        await products_changed()
+    return success({"updated": updated})
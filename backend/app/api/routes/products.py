@@ -1,19 +1,35 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc
-from uuid import UUID, uuid4
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
 
 from app.core.database import get_db
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductOut, ProductUpdate, ProductListResponse
+from app.schemas.product import (
+    ProductCreate, ProductOut, ProductUpdate, ProductEnvelope, ProductListEnvelope, product_page,
+)
 from app.core.dependencies import get_current_user
-from app.models.user import User
-from app.api.routes.upload import UPLOAD_DIR
-from app.core.utils import delete_file_safe
+from app.core.principal import AuthPrincipal
+from app.core.uploads import IMAGE_UPLOAD_OPENAPI, receive_image_uploads
+from app.core.images import process_uploads
+from app.core.storage import collect_garbage, image_stems
 from app.schemas.search import ProductSearchRequest
-from app.core.advanced_query import apply_filters, apply_search, apply_sort
+from app.core.advanced_query import (
+    apply_filters, apply_search, apply_sort, resolve_sort, LIST_SORT_OPTIONS, PRODUCT_TIEBREAKER,
+)
+from app.core.pagination import keyset_query, keyset_page
+from app.core.product_fields import projection_columns, resolve_fieldset
+from app.core.rate_limit import search_limit
+from app.core.counting import count_total, count_cache_key
+from app.core.catalog import products_changed
+from app.core.product_cache import product_cache, detail_key, list_key
+from app.core.config import settings
+from app.core.http_cache import (
+    version_columns, item_validators, page_validators, has_conditional_headers,
+    is_not_modified, not_modified_response, validator_headers,
+)
+from app.core.responses import success_json
 from app.schemas.response import SuccessResponse
 
 router = APIRouter(prefix="/products", tags=["products"])
@@ -23,78 +39,218 @@ def success(data):
     return SuccessResponse(data=data)
 
 
-# 🔍 Advanced Search
-@router.post("/search", response_model=SuccessResponse)
-def search_products(
-    body: ProductSearchRequest,
-    db: Session = Depends(get_db)
-):
-    query = db.query(Product)
-    query = apply_filters(query, body.filters)
-    query = apply_search(query, body.search)
-    query = apply_sort(query, body.sort)
+# Kolom yang dibutuhkan ProductOut: list/detail di-fetch sebagai Row, tanpa identity map ORM
+PRODUCT_OUT_COLUMNS = tuple(getattr(Product, name) for name in ProductOut.model_fields)
+
+
+def page_json(page: dict, fieldset: tuple[str, ...] | None = None) -> str:
+    """Halaman berisi Row → JSON dalam satu pass pydantic-core."""
+    return product_page(page, fieldset).model_dump_json()
+
 
-    total = query.count()
-    products = query.offset((body.page - 1) * body.limit).limit(body.limit).all()
+def fieldset_or_400(view: str | None, fields) -> tuple[str, ...] | None:
+    try:
+        return resolve_fieldset(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return success({
-        "page": body.page,
-        "limit": body.limit,
+
+async def fetch_items(db: AsyncSession, stmt):
+    """Entity tunggal → list entity; select multi-kolom → list Row."""
+    result = await db.execute(stmt)
+    if len(stmt.column_descriptions) == 1:
+        return list(result.scalars().all())
+    return list(result.all())
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    sort,
+    page: int,
+    limit: int,
+    cursor: str | None,
+    use_cursor: bool,
+    count_key: str,
+    count_strategy: str | None = None,
+    search=None,
+    serialize=None,
+    known_total: tuple[int, str] | None = None,
+):
+    """
+    Page/limit (default, backward compatible) atau keyset pagination bila
+    `use_cursor` aktif. Mode cursor tidak memakai OFFSET sehingga halaman
+    dalam tetap murah. Total dihitung lewat `count_total` dan strategi yang
+    dipakai dilaporkan di `total_strategy`. `known_total` (dari probe kondisional
+    pada request yang sama) dipakai ulang supaya COUNT tidak jalan dua kali.
+    """
+    serialize = serialize or (lambda items: items)
+    total, total_strategy = known_total or await count_total(db, query, count_key, count_strategy)
+
+    if not use_cursor:
+        query = apply_sort(query, sort, search)
+        items = await fetch_items(db, query.offset((page - 1) * limit).limit(limit))
+        return {
+            "page": page,
+            "limit": limit,
+            "total": total,
+            "total_strategy": total_strategy,
+            "pages": (total + limit - 1) // limit,
+            "items": serialize(items),
+        }
+
+    page_query, window = keyset_query(query, resolve_sort(sort, search), PRODUCT_TIEBREAKER, limit, cursor)
+    result = keyset_page((await db.execute(page_query)).all(), window)
+    return {
+        "limit": limit,
         "total": total,
-        "pages": (total + body.limit - 1) // body.limit,
-        "items": products,
-    })
+        "total_strategy": total_strategy,
+        "items": serialize(result.items),
+        "next_cursor": result.next_cursor,
+        "prev_cursor": result.prev_cursor,
+    }
+
+
+# 🔍 Advanced Search
+@router.post("/search", response_model=ProductListEnvelope, dependencies=[Depends(search_limit.by_user_or_ip)])
+async def search_products(
+    body: ProductSearchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    def build_query(*entities):
+        query = select(*entities)
+        query = apply_filters(query, body.filters)
+        return apply_search(query, body.search)
+
+    count_key = count_cache_key(
+        "search",
+        [f.model_dump() for f in body.filters or []],
+        body.search.model_dump() if body.search else None,
+    )
+    use_cursor = body.pagination == "cursor" or body.cursor is not None
+    fieldset = fieldset_or_400(body.view, body.fields)
+    params = {**body.model_dump(exclude={"view", "fields"}), "fields": fieldset}
+
+    async def fetch(query, known_total=None):
+        return await paginate(
+            db, query, body.sort, body.page, body.limit, body.cursor, use_cursor,
+            count_key=count_key, count_strategy=body.count, search=body.search, known_total=known_total,
+        )
+
+    # Probe ringan (id + timestamp) dulu bila client punya salinan (halaman list: ETag saja)
+    known_total = None
+    if "if-none-match" in request.headers:
+        probe = await fetch(build_query(*version_columns(Product)))
+        etag = page_validators("products:search", params, probe)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        known_total = (probe["total"], probe["total_strategy"])
+
+    data = await fetch(build_query(*projection_columns(fieldset)), known_total)
+    etag = page_validators("products:search", params, data)
+    return success_json(page_json(data, fieldset), validator_headers(etag))
 
 
 # 🟢 List Products (public)
-@router.get("/", response_model=SuccessResponse)
-def list_products(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=ProductListEnvelope)
+async def list_products(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    sort: str = Query("created_desc", description="created_asc | created_desc | price_asc | price_desc")
+    sort: str = Query("created_desc", description="created_asc | created_desc | price_asc | price_desc"),
+    pagination: str = Query("page", description="page | cursor"),
+    cursor: str | None = Query(None, description="next_cursor / prev_cursor dari response sebelumnya"),
+    count: str | None = Query(None, description="exact | cached | estimated (default dari settings)"),
+    view: str | None = Query(None, description="full | card (card: tanpa description)"),
+    fields: str | None = Query(None, description="Sparse fieldset, mis. id,name,price,image_variants"),
 ):
-    query = db.query(Product)
-
-    # Sorting
-    if sort == "price_asc":
-        query = query.order_by(asc(Product.price))
-    elif sort == "price_desc":
-        query = query.order_by(desc(Product.price))
-    elif sort == "created_asc":
-        query = query.order_by(asc(Product.created_at))
-    else:
-        query = query.order_by(desc(Product.created_at))
-
-    total = query.count()
-    products = query.offset((page - 1) * limit).limit(limit).all()
-
-    return success({
-        "page": page,
+    sort = sort if sort in LIST_SORT_OPTIONS else "created_desc"
+    use_cursor = pagination == "cursor" or cursor is not None
+    fieldset = fieldset_or_400(view, fields)
+    params = {
+        "page": None if use_cursor else page,
         "limit": limit,
-        "total": total,
-        "pages": (total + limit - 1) // limit,
-        "items": [ProductOut.model_validate(p) for p in products],
-    })
+        "sort": sort,
+        "cursor": cursor if use_cursor else None,
+        "mode": "cursor" if use_cursor else "page",
+        "count": count,
+        "fields": ",".join(fieldset) if fieldset is not None else None,
+    }
+
+    cache_key = await list_key(**params) if settings.RESPONSE_CACHE_ENABLED else None
+    cached = await product_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        if is_not_modified(request, cached["etag"]):
+            return not_modified_response(cached["etag"])
+        return success_json(cached["data"], validator_headers(cached["etag"]))
+
+    async def fetch(query, known_total=None):
+        return await paginate(
+            db, query, LIST_SORT_OPTIONS[sort], page, limit, cursor, use_cursor,
+            count_key=count_cache_key("list"), count_strategy=count, known_total=known_total,
+        )
+
+    known_total = None
+    if "if-none-match" in request.headers:
+        probe = await fetch(select(*version_columns(Product)))
+        etag = page_validators("products:list", params, probe)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        known_total = (probe["total"], probe["total_strategy"])
+
+    page_data = await fetch(select(*projection_columns(fieldset)), known_total)
+    etag = page_validators("products:list", params, page_data)
+    data = page_json(page_data, fieldset)
+
+    if cache_key is not None:
+        await product_cache.set(cache_key, {"data": data, "etag": etag})
+    return success_json(data, validator_headers(etag))
 
 
 # 🟢 Get Product Detail
-@router.get("/{product_id}", response_model=SuccessResponse)
-def get_product(product_id: UUID, db: Session = Depends(get_db)):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+@router.get("/{product_id}", response_model=ProductEnvelope)
+async def get_product(product_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    cache_key = await detail_key(product_id) if settings.RESPONSE_CACHE_ENABLED else None
+    cached = await product_cache.get(cache_key) if cache_key else None
+    if cached is not None:
+        if is_not_modified(request, cached["etag"], cached["last_modified"]):
+            return not_modified_response(cached["etag"], cached["last_modified"])
+        return success_json(cached["data"], validator_headers(cached["etag"], cached["last_modified"]))
+
+    if has_conditional_headers(request):
+        row = (await db.execute(select(*version_columns(Product)).where(Product.id == product_id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Product not found")
+        etag, last_modified = item_validators("product", row)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    row = (await db.execute(select(*PRODUCT_OUT_COLUMNS).where(Product.id == product_id))).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Product not found")
-    return success(ProductOut.model_validate(product))
+
+    etag, last_modified = item_validators("product", row)
+    data = ProductOut.model_validate(row).model_dump_json()
+    if cache_key is not None:
+        await product_cache.set(cache_key, {
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified.isoformat() if last_modified else None,
+        })
+    return success_json(data, validator_headers(etag, last_modified))
 
 
 # 🔒 Create Product
 @router.post("/", response_model=SuccessResponse)
-def create_product(
+async def create_product(
     payload: ProductCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user)
 ):
     product = Product(
+        sku=payload.sku,
         name=payload.name,
         category=payload.category,
         description=payload.description,
@@ -106,93 +262,91 @@ def create_product(
         created_by_id=current_user.id,
     )
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
+    await products_changed(product.id)
     return success(ProductOut.model_validate(product))
 
 
 # 🔒 Update Product
 @router.put("/{product_id}", response_model=SuccessResponse)
-def update_product(
+async def update_product(
     product_id: UUID,
     payload: ProductUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user)
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    for field, value in payload.dict(exclude_unset=True).items():
+    for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(product, field, value)
 
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
+    await products_changed(product.id)
     return success(ProductOut.model_validate(product))
 
 
 # 🔒 Delete Product
 @router.delete("/{product_id}", response_model=SuccessResponse)
-def delete_product(
+async def delete_product(
     product_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user)
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    if product.images:
-        for image_url in product.images:
-            filename = os.path.basename(image_url)
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            delete_file_safe(file_path, UPLOAD_DIR)
+    images = product.images or []
 
-    db.delete(product)
-    db.commit()
+    await db.delete(product)
+    await db.commit()
+    await products_changed(product_id)
+    # blob bisa dipakai produk lain (dedup); GC menghapusnya hanya jika tak ada referensi lagi
+    background_tasks.add_task(collect_garbage, image_stems(images))
     return success({"deleted_id": str(product_id)})
 
 
 # 📷 Upload Images
-@router.post("/{product_id}/images", response_model=SuccessResponse)
+@router.post("/{product_id}/images", response_model=SuccessResponse, openapi_extra=IMAGE_UPLOAD_OPENAPI)
 async def upload_product_images(
     product_id: UUID,
-    files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    urls = []
-    for file in files:
-        if not file.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail=f"{file.filename} is not an image")
-
-        ext = os.path.splitext(file.filename)[1]
-        filename = f"{uuid4()}{ext}"
-        path = os.path.join(UPLOAD_DIR, filename)
-        with open(path, "wb") as f:
-            f.write(await file.read())
-
-        urls.append(f"/upload/{filename}")
+    # body baru dibaca setelah produk dipastikan ada
+    filenames = await receive_image_uploads(request)
+    urls = [f"/upload/{filename}" for filename in filenames]
 
     product.images = (product.images or []) + urls
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
+    await products_changed(product.id)
+    # turunan (thumbnail/medium/WebP) dibuat di process pool setelah response terkirim
+    background_tasks.add_task(process_uploads, filenames)
     return success({"message": "Images attached", "images": product.images})
 
 
 # 🗑️ Delete Image
 @router.delete("/{product_id}/images", response_model=SuccessResponse)
-def delete_product_image(
+async def delete_product_image(
     product_id: UUID,
     image_url: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user)
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
@@ -200,11 +354,11 @@ def delete_product_image(
         raise HTTPException(status_code=404, detail="Image not found in product")
 
     product.images = [img for img in product.images if img != image_url]
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
+    await products_changed(product.id)
 
     filename = os.path.basename(image_url)
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    delete_file_safe(file_path, UPLOAD_DIR)
+    background_tasks.add_task(collect_garbage, image_stems([image_url]))
 
     return success({"message": f"Deleted image {filename}", "remaining_images": product.images})
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_user
+from app.core.principal import AuthPrincipal
+from app.core.catalog import products_changed
+from app.core.stock import reserve_stock, lock_reservation, release_reservation, is_expired
+from app.models.reservation import (
+    StockReservation, RESERVATION_ACTIVE, RESERVATION_COMMITTED, RESERVATION_EXPIRED,
+)
+from app.schemas.reservation import ReservationCreate, ReservationOut
+from app.schemas.response import SuccessResponse
+
+router = APIRouter(prefix="/reservations", tags=["reservations"])
+
+# 🔹 Helper agar semua response seragam
+def success(data):
+    return SuccessResponse(data=data)
+
+
+def _check_owner(reservation: StockReservation | None, current_user: AuthPrincipal) -> StockReservation:
+    # reservasi user lain diperlakukan sama dengan tidak ada
+    if reservation is None or (reservation.user_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return reservation
+
+
+async def _locked_active(db: AsyncSession, reservation_id: UUID, current_user: AuthPrincipal) -> StockReservation:
+    reservation = _check_owner(await lock_reservation(db, reservation_id), current_user)
+    if reservation.status != RESERVATION_ACTIVE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Reservation is already {reservation.status}")
+    return reservation
+
+
+# 🛒 Reserve stock (semua item atau tidak sama sekali)
+@router.post("/", response_model=SuccessResponse, status_code=status.HTTP_201_CREATED)
+async def create_reservation(
+    payload: ReservationCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    reservation = await reserve_stock(db, current_user.id, payload.quantities())
+    await db.commit()
+    for item in reservation.items:
+        await products_changed(item.product_id)
+    return success(ReservationOut.model_validate(reservation))
+
+
+# 🔍 Detail reservation
+@router.get("/{reservation_id}", response_model=SuccessResponse)
+async def get_reservation(
+    reservation_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    reservation = _check_owner(await db.get(StockReservation, reservation_id), current_user)
+    return success(ReservationOut.model_validate(reservation))
+
+
+# ✅ Commit: stok yang ditahan menjadi terjual
+@router.post("/{reservation_id}/commit", response_model=SuccessResponse)
+async def commit_reservation(
+    reservation_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    reservation = await _locked_active(db, reservation_id, current_user)
+    if is_expired(reservation):
+        # belum disapu sweeper: kembalikan stoknya sekarang, commit ditolak
+        changed = await release_reservation(db, reservation, RESERVATION_EXPIRED)
+        await db.commit()
+        for product_id in changed:
+            await products_changed(product_id)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Reservation has expired")
+
+    reservation.status = RESERVATION_COMMITTED
+    await db.commit()
+    await db.refresh(reservation)
+    return success(ReservationOut.model_validate(reservation))
+
+
+# ↩️ Release: stok dikembalikan
+@router.delete("/{reservation_id}", response_model=SuccessResponse)
+async def release(
+    reservation_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    reservation = await _locked_active(db, reservation_id, current_user)
+    changed = await release_reservation(db, reservation)
+    await db.commit()
+    await db.refresh(reservation)
+    for product_id in changed:
+        await products_changed(product_id)
+    return success(ReservationOut.model_validate(reservation))
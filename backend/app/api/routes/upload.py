@@ -1,38 +1,49 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import RedirectResponse
+from typing import Literal, Optional
 import os
-from uuid import uuid4
-from fastapi.responses import FileResponse
+from app.core.config import settings
+from app.core.storage import UPLOAD_DIR, storage
+from app.core.static_files import FALLBACK_CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, file_response, stat_file
+from app.core.uploads import IMAGE_UPLOAD_OPENAPI, receive_image_uploads
+from app.core.images import VARIANT_SIZES, process_uploads, variant_path
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
-UPLOAD_DIR = os.path.join(os.getcwd(), "app", "storage", "uploads")
-
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-@router.post("/image")
-async def upload_image(files: List[UploadFile] = File(...)):
-    urls = []
-    for file in files:
-        if not file.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail=f"{file.filename} is not an image")
-
-        ext = os.path.splitext(file.filename)[1]
-        filename = f"{uuid4()}{ext}"
-        file_path = os.path.join(UPLOAD_DIR, filename)
-
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-
-        # Generate public URL
-        urls.append(f"/upload/{filename}")
+@router.post("/image", openapi_extra=IMAGE_UPLOAD_OPENAPI)
+async def upload_image(request: Request, background_tasks: BackgroundTasks):
+    # Body di-stream langsung ke file staging (batas per file dicek saat diterima), rename atomik
+    filenames = await receive_image_uploads(request)
+    # thumbnail/medium/WebP dibuat setelah response terkirim
+    background_tasks.add_task(process_uploads, filenames)
+
+    # Generate public URL
+    return {"urls": [f"/upload/{filename}" for filename in filenames]}
+
+async def get_uploaded_file(
+    filename: str,
+    request: Request,
+    size: Optional[str] = Query(None, description="thumb | medium | full"),
+    format: Optional[Literal["webp"]] = Query(None, description="webp (kosong = format asli)"),
+):
+    if size is not None and size not in VARIANT_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unknown size '{size}'. Allowed: {', '.join(VARIANT_SIZES)}")
+
+    if not storage.is_local:
+        # blob di S3: diarahkan ke URL publik bucket/CDN (tanpa turunan)
+        return RedirectResponse(storage.url(filename), status_code=307)
+
+    # turunan belum jadi (masih diproses) → file asli, dengan cache singkat (bukan immutable)
+    path, exact = variant_path(UPLOAD_DIR, filename, size, format)
+    stat_result = await stat_file(path)
+    if stat_result is None and not exact:
+        path, stat_result = os.path.join(UPLOAD_DIR, filename), await stat_file(os.path.join(UPLOAD_DIR, filename))
+    if stat_result is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    cache_control = IMMUTABLE_CACHE_CONTROL if exact else FALLBACK_CACHE_CONTROL
+    return await file_response(request, path, stat_result, cache_control)
 
-    return {"urls": urls}
 
-@router.get("/{filename}")
-async def get_uploaded_file(filename: str):
-    file_path = os.path.join(UPLOAD_DIR, filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(file_path)
+# Mode "static": GET /upload/* dilayani UploadStaticFiles yang di-mount di main.py
+if settings.UPLOAD_SERVE_MODE == "router" or not storage.is_local:
+    router.add_api_route("/{filename}", get_uploaded_file, methods=["GET", "HEAD"])
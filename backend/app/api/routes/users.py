@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from app.core.dependencies import get_current_user
-from app.models.user import User
+from app.core.principal import AuthPrincipal
 from app.schemas.response import SuccessResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -8,8 +8,9 @@ router = APIRouter(prefix="/users", tags=["users"])
 def success(data):
     return SuccessResponse(data=data)
 
+# principal dari token (+ cache status auth): tanpa query users/roles per request
 @router.get("/me")
-def read_current_user(current_user: User = Depends(get_current_user)):
+async def read_current_user(current_user: AuthPrincipal = Depends(get_current_user)):
     return success({
         "id": str(current_user.id),
         "email": current_user.email,
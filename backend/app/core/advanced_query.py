@@ -1,45 +1,110 @@
-from sqlalchemy import asc, desc, or_, and_
-from sqlalchemy.orm import Query
-from app.models.product import Product
-
-def apply_filters(query: Query, filters):
+import re
+from fastapi import HTTPException, status
+from sqlalchemy import Select, asc, desc, or_, and_, func, cast
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from app.models.product import Product, SEARCH_CONFIG
+from app.core.pagination import SortKey
+from app.core.product_fields import PRODUCT_FIELDS, OPERATORS, SORTABLE_FIELDS, SEARCHABLE_FIELDS
+from app.schemas.search import SortField
+
+# Opsi `sort` pada GET /products, dipetakan ke SortField yang sama dengan /products/search
+LIST_SORT_OPTIONS = {
+    "created_desc": [SortField(field="created_at", direction="desc")],
+    "created_asc": [SortField(field="created_at", direction="asc")],
+    "price_asc": [SortField(field="price", direction="asc")],
+    "price_desc": [SortField(field="price", direction="desc")],
+}
+
+# Tiebreaker untuk keyset pagination: primary key selalu unik
+PRODUCT_TIEBREAKER = SortKey("id", Product.id, "asc")
+
+def _bad_request(message: str):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+def _compile_filter(f):
+    spec = PRODUCT_FIELDS.get(f.field)
+    if spec is None or not spec.operators:
+        raise _bad_request(f"Filtering on '{f.field}' is not allowed")
+
+    op = f.operator.lower()
+    if op not in spec.operators:
+        allowed = " | ".join(o for o in OPERATORS if o in spec.operators)
+        raise _bad_request(f"Operator '{op}' is not allowed for '{f.field}' (allowed: {allowed})")
+
+    # Koersi value sekali di sini sehingga bind parameter sudah bertipe kolom
+    try:
+        if op == "between":
+            if not isinstance(f.value, (list, tuple)) or len(f.value) != 2:
+                raise ValueError("'between' expects [min, max]")
+            low, high = spec.coerce(f.value[0]), spec.coerce(f.value[1])
+            return spec.column.between(low, high)
+        value = spec.coerce(f.value)
+    except (TypeError, ValueError) as e:
+        raise _bad_request(f"Invalid value for '{f.field}': {e}")
+
+    if op == "eq":
+        return spec.column == value
+    if op == "like":
+        return spec.column.ilike(f"%{value}%")
+    if op == "gt":
+        return spec.column > value
+    return spec.column < value
+
+
+def compile_filters(filters):
+    """Gabungkan semua FilterField menjadi satu ekspresi AND (None jika tidak ada filter)."""
     if not filters:
+        return None
+    return and_(*[_compile_filter(f) for f in filters])
+
+
+def apply_filters(query: Select, filters):
+    condition = compile_filters(filters)
+    if condition is None:
         return query
+    return query.filter(condition)
 
-    for f in filters:
-        column = getattr(Product, f.field, None)
-        if not column:
-            continue
 
-        op = f.operator.lower()
-        val = f.value
+# Field yang tercakup Product.search_vector (GIN index)
+FULLTEXT_FIELDS = {"name", "description"}
 
-        if op == "eq":
-            query = query.filter(column == val)
-        elif op == "like":
-            query = query.filter(column.ilike(f"%{val}%"))
-        elif op == "gt":
-            query = query.filter(column > val)
-        elif op == "lt":
-            query = query.filter(column < val)
-        elif op == "between" and isinstance(val, (list, tuple)) and len(val) == 2:
-            query = query.filter(column.between(val[0], val[1]))
 
-    return query
+def search_tsquery(search):
+    """
+    Ubah input bebas menjadi tsquery: semua kata harus ada (AND) dan kata
+    terakhir dicocokkan sebagai prefix, supaya pencarian per ketikan tetap jalan.
+    """
+    if not search or not search.value:
+        return None
+
+    tokens = re.findall(r"\w+", search.value.lower())
+    if not tokens:
+        return None
 
+    terms = tokens[:-1] + [f"{tokens[-1]}:*"]
+    return func.to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), " & ".join(terms))
 
-def apply_search(query: Query, search):
+
+def apply_search(query: Select, search):
     if not search or not search.value:
         return query
 
     value = search.value
     fields = search.fields or ["name", "description"]
+    unknown = [f for f in fields if f not in SEARCHABLE_FIELDS]
+    if unknown:
+        raise _bad_request(f"Searching on {unknown} is not allowed (allowed: {' | '.join(SEARCHABLE_FIELDS)})")
     conditions = []
 
-    for f in fields:
-        column = getattr(Product, f, None)
-        if column is not None:
-            conditions.append(column.ilike(f"%{value}%"))
+    tsquery = search_tsquery(search)
+    if tsquery is not None and FULLTEXT_FIELDS.intersection(fields):
+        conditions.append(Product.search_vector.op("@@")(tsquery))
+
+    if "name" in fields:
+        # Trigram index: toleran typo (similarity) dan substring di nama
+        conditions.append(Product.name.op("%")(value))
+        conditions.append(Product.name.ilike(f"%{value}%"))
 
     if conditions:
         query = query.filter(or_(*conditions))
@@ -47,15 +112,35 @@ def apply_search(query: Query, search):
     return query
 
 
-def apply_sort(query: Query, sort):
+def resolve_sort(sort, search=None) -> list[SortKey]:
+    """
+    Terjemahkan SortField menjadi SortKey. Field khusus `relevance` mengurutkan
+    berdasarkan skor full-text (butuh `search`); tanpa search, field ini diabaikan.
+    """
     if not sort:
-        return query.order_by(desc(Product.created_at))
+        return [SortKey("created_at", Product.created_at, "desc")]
 
-    order_clauses = []
+    keys = []
     for s in sort:
-        column = getattr(Product, s.field, None)
-        if column is not None:
-            order_clauses.append(asc(column) if s.direction == "asc" else desc(column))
+        direction = "asc" if s.direction == "asc" else "desc"
+        if s.field == "relevance":
+            tsquery = search_tsquery(search)
+            if tsquery is not None:
+                keys.append(SortKey("relevance", func.ts_rank_cd(Product.search_vector, tsquery), direction))
+            continue
+
+        spec = PRODUCT_FIELDS.get(s.field)
+        if spec is None or not spec.sortable:
+            raise _bad_request(
+                f"Sorting on '{s.field}' is not allowed (allowed: relevance | {' | '.join(SORTABLE_FIELDS)})"
+            )
+        keys.append(SortKey(s.field, spec.column, direction))
+
+    return keys
+
+
+def apply_sort(query: Select, sort, search=None):
+    order_clauses = [k.clause() for k in resolve_sort(sort, search)]
 
     if order_clauses:
         query = query.order_by(*order_clauses)
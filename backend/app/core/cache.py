@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# Cache ber-`name` → hit/miss-nya diekspor ke /metrics (app/core/instrumentation.py)
+named_caches: "weakref.WeakValueDictionary[str, TTLCache]" = weakref.WeakValueDictionary()
+
+
+class TTLCache:
+    """
+    LRU cache in-process dengan TTL dan batas ukuran.
+    Aman dipakai dari banyak thread (route sync berjalan di threadpool).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if name is not None:
+            named_caches[name] = self
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ==========================================
+# 🌐 Shared cache tier (pluggable)
+# ==========================================
+class CacheBackend:
+    """Interface tier cache bersama antar worker/instance. Value selalu bytes; semua operasi async."""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, *keys: str):
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class InMemoryBackend(CacheBackend):
+    """Stand-in lokal untuk tier bersama (dev/test); hanya berbagi data dalam satu proses."""
+
+    def __init__(self, maxsize: int = 10000):
+        self._cache = TTLCache(maxsize=maxsize)
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+        return self._cache.get(key)
+
+    async def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+
+    async def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend(CacheBackend):
+    """Tier bersama via Redis (`redis.asyncio`; butuh package `redis`, tidak wajib terpasang)."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RedisBackend requires the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+
+    async def get(self, key):
+        return await self._client.get(key)
+
+    async def set(self, key, value, ttl):
+        await self._client.set(key, value, ex=max(int(ttl), 1))
+
+    async def delete(self, *keys):
+        if keys:
+            await self._client.delete(*keys)
+
+    async def incr(self, key):
+        return int(await self._client.incr(key))
+
+
+def backend_from_url(url: str | None) -> CacheBackend | None:
+    """`memory://` → InMemoryBackend, `redis://...` → RedisBackend, kosong → tanpa tier bersama."""
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
+
+
+class ResponseCache:
+    """
+    Cache dua tingkat untuk payload response (JSON-able):
+    LRU in-process (TTL pendek) di depan tier bersama opsional (TTL lebih panjang).
+
+    Entry yang tidak bisa dihapus satu per satu (mis. halaman list) memakai
+    `generation` di key; `bump_generation` membuat semua entry lama tidak terpakai.
+    Dengan tier bersama, nilai generation di-memo per proses selama `generation_ttl`
+    detik (bump dari proses ini langsung terlihat), jadi cache hit tidak perlu
+    round trip tambahan hanya untuk membaca generation.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local: TTLCache,
+        shared: CacheBackend | None = None,
+        shared_ttl: float = 60.0,
+        generation_ttl: float = 1.0,
+    ):
+        self.namespace = namespace
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self._generations: dict[str, int] = {}
+        self._shared_generations = TTLCache(maxsize=64, ttl=generation_ttl)
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    def key(self, *parts) -> str:
+        return ":".join([self.namespace, *[str(p) for p in parts]])
+
+    async def generation(self, name: str = "generation") -> int:
+        if self.shared is None:
+            return self._generations.get(name, 0)
+        value = self._shared_generations.get(name)
+        if value is None:
+            raw = await self.shared.get(self.key(name))
+            value = int(raw) if raw else 0
+            self._shared_generations.set(name, value)
+        return value
+
+    async def bump_generation(self, name: str = "generation"):
+        if self.shared is not None:
+            self._shared_generations.set(name, await self.shared.incr(self.key(name)))
+        else:
+            self._generations[name] = self._generations.get(name, 0) + 1
+
+    async def get(self, key: str):
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        raw = await self.shared.get(key)
+        if raw is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value):
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(key, json.dumps(value, separators=(",", ":")).encode("utf-8"), self.shared_ttl)
+
+    async def delete(self, key: str):
+        self.local.delete(key)
+        if self.shared is not None:
+            await self.shared.delete(key)
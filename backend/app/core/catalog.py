@@ -0,0 +1,29 @@
+"""
+Hook invalidasi katalog produk.
+
+Modul lain (cache total, cache response, dst.) mendaftarkan callback lewat
+`on_products_changed`, lalu route yang menulis produk memanggil
+`await products_changed(...)` setelah commit. Callback boleh sync atau async.
+"""
+import inspect
+import logging
+from typing import Callable
+from uuid import UUID
+
+_listeners: list[Callable[[UUID | None], None]] = []
+
+
+def on_products_changed(callback: Callable[[UUID | None], None]):
+    """Daftarkan callback; dipanggil dengan id produk (atau None jika banyak produk berubah)."""
+    _listeners.append(callback)
+    return callback
+
+
+async def products_changed(product_id: UUID | None = None):
+    for callback in _listeners:
+        try:
+            result = callback(product_id)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logging.exception("Product invalidation callback failed")
@@ -0,0 +1,250 @@
+"""
+Kompresi response (gzip, plus br/zstd bila library-nya terpasang).
+
+- Encoding dinegosiasikan dari Accept-Encoding (q-value, lalu urutan preferensi server).
+- Body di bawah COMPRESSION_MIN_BYTES dikirim apa adanya.
+- Level per jenis konten: JSON/teks memakai level sedang, stream (export NDJSON/CSV)
+  memakai level rendah dan di-flush per chunk supaya tetap mengalir.
+- /upload dan response yang sudah ber-Content-Encoding (sibling .br/.gz), 206,
+  serta tipe biner (gambar, arsip) dilewati.
+- Response ber-ETag (list/detail produk, termasuk yang datang dari response cache)
+  menyimpan hasil kompresinya di LRU, jadi body yang sama tidak dikompres ulang.
+  ETag dijadikan weak (W/"...") karena body-nya berbeda byte dengan versi identity;
+  `is_not_modified` sudah membandingkan secara weak.
+"""
+import hashlib
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.cache import TTLCache
+from app.core.storage import UPLOAD_URL_PREFIX
+
+try:
+    import brotli
+except ImportError:  # opsional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # opsional: pip install zstandard
+    zstandard = None
+
+
+# Level (gzip / br / zstd) per jenis konten
+LEVELS = {
+    "json": {"gzip": 6, "br": 5, "zstd": 6},
+    "text": {"gzip": 6, "br": 6, "zstd": 6},
+    "stream": {"gzip": 1, "br": 1, "zstd": 1},
+}
+
+COMPRESSIBLE_TYPES = {
+    "application/json": "json",
+    "application/x-ndjson": "stream",
+    "text/csv": "stream",
+    "application/javascript": "text",
+    "application/xml": "text",
+    "image/svg+xml": "text",
+}
+
+# Di atas ini kompresi one-shot dipindah ke threadpool supaya tidak memblok event loop
+THREADPOOL_MIN_BYTES = 256 * 1024
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# encoding → (kompresi one-shot, kompresor stream)
+CODECS = {"gzip": (_gzip, _GzipStream)}
+if brotli is not None:
+    CODECS["br"] = (lambda data, level: brotli.compress(data, quality=level), _BrotliStream)
+if zstandard is not None:
+    CODECS["zstd"] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data), _ZstdStream)
+
+
+def negotiate_encoding(accept_encoding: str, preferred: list[str]) -> str | None:
+    """Pilih encoding dengan q tertinggi dari Accept-Encoding; seri → urutan `preferred`."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in preferred:
+        if encoding not in CODECS:
+            continue
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def content_kind(content_type: str) -> str | None:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in COMPRESSIBLE_TYPES:
+        return COMPRESSIBLE_TYPES[media_type]
+    if media_type.startswith("text/"):
+        return "text"
+    return None
+
+
+class CompressionMiddleware:
+    """Pure ASGI: kompresi body response hasil negosiasi Accept-Encoding."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        encodings: list[str] | None = None,
+        cache_max_entries: int = 256,
+        cache_ttl: int = 300,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = encodings or ["br", "zstd", "gzip"]
+        self.cache = TTLCache(maxsize=cache_max_entries, ttl=cache_ttl, name="compression") if cache_max_entries > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UPLOAD_URL_PREFIX):
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        responder = _CompressionResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    async def compress(self, encoding: str, kind: str, body: bytes, etag: str | None) -> bytes:
+        key = None
+        if etag and self.cache is not None:
+            # ETag + digest body: aman walau ETag dipakai ulang untuk body berbeda
+            key = f"{encoding}:{etag}:{hashlib.blake2b(body, digest_size=16).hexdigest()}"
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        compress, _ = CODECS[encoding]
+        level = LEVELS[kind][encoding]
+        if len(body) >= THREADPOOL_MIN_BYTES:
+            compressed = await run_in_threadpool(compress, body, level)
+        else:
+            compressed = compress(body, level)
+
+        if key is not None:
+            self.cache.set(key, compressed)
+        return compressed
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str | None):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.start_message = None
+        self.kind = None
+        self.stream = None  # kompresor stream bila body dikirim bertahap
+        self.passthrough = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.kind = content_kind(headers.get("content-type", ""))
+            self.passthrough = (
+                self.kind is None
+                or "content-encoding" in headers
+                or "content-range" in headers
+                or message["status"] in (204, 206, 304)
+                or message["status"] < 200
+            )
+            if self.kind is not None and not self.passthrough:
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            if self.passthrough or self.encoding is None:
+                self.passthrough = True
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(scope=self.start_message)
+
+        if self.stream is None and self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            declared = headers.get("content-length")
+            small = len(body) < self.middleware.minimum_size if not more_body else (
+                declared is not None and int(declared) < self.middleware.minimum_size
+            )
+            if small:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+
+            if not more_body:
+                compressed = await self.middleware.compress(self.encoding, self.kind, body, etag)
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            # streaming: panjang akhir tidak diketahui → chunked
+            del headers["Content-Length"]
+            self.stream = CODECS[self.encoding][1](LEVELS["stream"][self.encoding])
+            await self._send(start)
+
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
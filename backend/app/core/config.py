@@ -7,16 +7,109 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Ecommerce API"
     DATABASE_URL: str
 
+    # 🏊 Connection pool (per worker uvicorn)
+    WEB_CONCURRENCY: int = Field(1, description="Jumlah worker uvicorn (untuk membagi budget koneksi)")
+    DB_MAX_CONNECTIONS: int = Field(80, description="Budget koneksi Postgres untuk seluruh worker aplikasi")
+    DB_POOL_SIZE: int | None = Field(None, description="Override pool_size; kosong = dihitung dari budget / worker")
+    DB_MAX_OVERFLOW: int = Field(5, description="Koneksi tambahan sementara di atas pool_size")
+    DB_POOL_TIMEOUT: float = Field(10.0, description="Detik menunggu koneksi sebelum checkout timeout")
+    DB_POOL_RECYCLE: int = Field(1800, description="Detik sebelum koneksi didaur ulang (hindari koneksi basi)")
+    DB_POOL_PRE_PING: bool = Field(True, description="Cek koneksi saat checkout")
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = Field(2.0, description="Batas waktu /health (checkout pool + SELECT 1) sebelum 503")
+
     # 🔐 JWT & Auth config
     ACCESS_SECRET: str = Field("super-secret-access", description="JWT access token secret")
     REFRESH_SECRET: str = Field("super-secret-refresh", description="JWT refresh token secret")
     ACCESS_EXPIRE_MINUTES: int = Field(30, description="Access token expiry in minutes")
     REFRESH_EXPIRE_DAYS: int = Field(7, description="Refresh token expiry in days")
+    JWT_VERIFY_CACHE_MAX_ENTRIES: int = Field(4096, description="Jumlah access token terverifikasi yang di-cache (0 = nonaktif)")
+    JWT_VERIFY_CACHE_MAX_TTL_SECONDS: int = Field(300, description="Batas umur entry cache token (selain exp token)")
+    AUTH_REVOCATION_CHECK: bool = Field(True, description="Cek user aktif & token_version; False = percaya klaim token sampai expiry")
+    AUTH_STATE_CACHE_TTL_SECONDS: int = Field(30, description="TTL cache status auth per user (0 = selalu query)")
+    AUTH_STATE_CACHE_MAX_ENTRIES: int = Field(10000, description="Jumlah user maksimum di cache status auth")
+
+    # 🔑 Password hashing (bcrypt)
+    BCRYPT_ROUNDS: int = Field(12, description="bcrypt cost; hash lama dengan cost lebih rendah di-rehash saat login")
+    PASSWORD_HASH_WORKERS: int = Field(2, description="Thread khusus bcrypt per worker (batas konkurensi)")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(32, description="Antrean maksimum sebelum login/register ditolak 503")
+
+    # 🚦 Rate limiting (format "N/second|minute|hour|day", burst = N)
+    RATE_LIMIT_ENABLED: bool = Field(True, description="Batasi login, register dan search (429 + Retry-After)")
+    RATE_LIMIT_STORE_URL: str | None = Field(None, description="kosong/memory:// = per worker | redis://host:6379/0 (dibagi antar worker)")
+    RATE_LIMIT_MAX_KEYS: int = Field(100000, description="Jumlah key maksimum di store in-process (LRU)")
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = Field(False, description="Ambil IP client dari X-Forwarded-For (hanya di belakang proxy tepercaya)")
+    RATE_LIMIT_LOGIN_IP: str = Field("20/minute", description="Percobaan login per IP")
+    RATE_LIMIT_LOGIN_EMAIL: str = Field("5/minute", description="Percobaan login per email (credential stuffing)")
+    RATE_LIMIT_REGISTER_IP: str = Field("10/hour", description="Registrasi per IP")
+    RATE_LIMIT_SEARCH: str = Field("120/minute", description="POST /products/search per user (atau per IP bila anonim)")
 
     # 🏗️ Environment & Security
     ENV: str = Field("development", description="Environment mode (development or production)")
     BACKEND_CORS_ORIGINS: str | None = None
 
+    # 🔢 Total count strategy (list & search)
+    COUNT_STRATEGY: str = Field("exact", description="exact | cached | estimated")
+    COUNT_CACHE_TTL_SECONDS: int = Field(30, description="TTL cache total per filter")
+    COUNT_CACHE_MAX_ENTRIES: int = Field(1024, description="Jumlah maksimum filter yang total-nya di-cache")
+    COUNT_ESTIMATE_THRESHOLD: int = Field(10000, description="Di atas estimasi ini, total tidak dihitung exact")
+
+    # 📤 Upload
+    UPLOAD_MAX_FILE_BYTES: int = Field(10 * 1024 * 1024, description="Ukuran maksimum per file upload")
+    UPLOAD_MAX_REQUEST_BYTES: int = Field(50 * 1024 * 1024, description="Ukuran maksimum body multipart per request")
+    UPLOAD_MAX_FILES: int = Field(10, description="Jumlah file maksimum per request")
+    UPLOAD_CHUNK_SIZE: int = Field(1024 * 1024, description="Ukuran chunk saat menyalin upload ke disk")
+    STORAGE_URL: str | None = Field(None, description="kosong = disk lokal | s3://bucket/prefix | s3local://bucket/prefix")
+    STORAGE_S3_ENDPOINT_URL: str | None = Field(None, description="Endpoint S3-compatible (MinIO, R2, ...); kosong = AWS")
+    STORAGE_S3_LOCAL_ROOT: str = Field("app/storage/s3", description="Direktori stand-in untuk s3local://")
+    STORAGE_PUBLIC_URL: str | None = Field(None, description="Base URL publik bucket/CDN untuk backend S3")
+    STORAGE_GC_INTERVAL_SECONDS: int = Field(3600, description="Interval sweep blob tak terpakai (0 = nonaktif)")
+    STORAGE_GC_GRACE_SECONDS: int = Field(3600, description="Blob yang lebih baru dari ini tidak disapu (belum di-attach)")
+    UPLOAD_SERVE_MODE: str = Field("router", description="router (dukung ?size=/&format=) | static (mount langsung, tanpa route)")
+    IMAGE_PIPELINE_ENABLED: bool = Field(True, description="Buat thumbnail/medium/WebP setelah upload (butuh Pillow)")
+    IMAGE_PIPELINE_WORKERS: int = Field(2, description="Jumlah proses untuk resize gambar per worker")
+
+    # 📦 Import / export massal
+    IMPORT_BATCH_SIZE: int = Field(1000, description="Baris per INSERT ... ON CONFLICT saat import")
+    IMPORT_MAX_ERRORS: int = Field(1000, description="Jumlah error per baris maksimum di laporan import")
+    EXPORT_BATCH_SIZE: int = Field(1000, description="Baris per fetch server-side cursor saat export")
+
+    # 🛒 Reservasi stok
+    STOCK_RESERVATION_TTL_SECONDS: int = Field(900, description="Lama stok ditahan sebelum reservasi kedaluwarsa")
+    STOCK_RESERVATION_MAX_ITEMS: int = Field(100, description="Jumlah produk maksimum per reservasi")
+    STOCK_RESERVATION_SWEEP_INTERVAL_SECONDS: int = Field(30, description="Interval sweep reservasi kedaluwarsa (0 = nonaktif)")
+    STOCK_RESERVATION_SWEEP_BATCH_SIZE: int = Field(500, description="Reservasi kedaluwarsa per transaksi sweep")
+
+    # 🧾 Logging
+    LOG_REQUEST_SAMPLE_RATE: float = Field(1.0, description="Fraksi request sukses yang di-log (error & request lambat selalu)")
+    LOG_SLOW_REQUEST_MS: float = Field(1000, description="Request di atas ini selalu di-log sebagai WARNING")
+    LOG_QUEUE_SIZE: int = Field(10000, description="Kapasitas antrean log; penuh → record dibuang (dihitung)")
+
+    # 📈 Metrics
+    METRICS_ENABLED: bool = Field(True, description="Ekspos GET /metrics (format teks Prometheus)")
+    METRICS_MULTIPROC_DIR: str | None = Field(None, description="Direktori snapshot per worker untuk agregasi multi-proses (kosongkan saat start)")
+    METRICS_FLUSH_INTERVAL_SECONDS: int = Field(5, description="Interval tiap worker menulis snapshot metrik")
+
+    # 🔬 SQL profiler
+    SQL_PROFILER_MODE: str = Field("off", description="off | header (X-SQL-Profile: 1) | always")
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD: int = Field(3, description="Statement sama dari asal yang sama >= ini → kandidat N+1")
+    SQL_PROFILER_EXPLAIN_MS: float = Field(100, description="SELECT di atas ini di-EXPLAIN ANALYZE (development; 0 = nonaktif)")
+    SQL_PROFILER_EXPLAIN_MAX: int = Field(3, description="Jumlah maksimum statement yang di-EXPLAIN per request")
+
+    # 🗜️ Kompresi response
+    COMPRESSION_ENABLED: bool = Field(True, description="Kompresi response JSON/teks sesuai Accept-Encoding")
+    COMPRESSION_MIN_BYTES: int = Field(1024, description="Body lebih kecil dari ini dikirim tanpa kompresi")
+    COMPRESSION_ENCODINGS: str = Field("br,zstd,gzip", description="Urutan preferensi server (br/zstd hanya bila library terpasang)")
+    COMPRESSION_CACHE_MAX_ENTRIES: int = Field(256, description="Body terkompresi per ETag yang disimpan (0 = nonaktif)")
+    COMPRESSION_CACHE_TTL_SECONDS: int = Field(300, description="TTL body terkompresi di cache")
+
+    # 🗄️ Response cache (public product reads)
+    RESPONSE_CACHE_ENABLED: bool = Field(True, description="Cache response GET /products dan /products/{id}")
+    RESPONSE_CACHE_LOCAL_TTL_SECONDS: int = Field(5, description="TTL LRU in-process (batas basi antar worker)")
+    RESPONSE_CACHE_LOCAL_MAX_ENTRIES: int = Field(512, description="Jumlah entry maksimum LRU in-process")
+    RESPONSE_CACHE_SHARED_URL: str | None = Field(None, description="memory:// | redis://host:6379/0 (kosong = tanpa tier bersama)")
+    RESPONSE_CACHE_SHARED_TTL_SECONDS: int = Field(60, description="TTL tier cache bersama")
+    RESPONSE_CACHE_GENERATION_TTL_SECONDS: float = Field(1.0, description="Memo generation tier bersama per proses (batas basi setelah invalidasi dari worker lain)")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
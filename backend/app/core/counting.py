@@ -0,0 +1,94 @@
+import json
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.cache import TTLCache
+from app.core.catalog import on_products_changed
+from app.core.config import settings
+
+COUNT_STRATEGIES = ("exact", "cached", "estimated")
+
+_count_cache = TTLCache(maxsize=settings.COUNT_CACHE_MAX_ENTRIES, ttl=settings.COUNT_CACHE_TTL_SECONDS, name="count")
+
+
+@on_products_changed
+def _invalidate_counts(product_id=None):
+    # Satu produk bisa berpindah kategori/status → semua total filter ikut basi
+    _count_cache.clear()
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON) <stmt>` dengan bind parameter asli statement."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def count_cache_key(*parts) -> str:
+    """Key cache dari filter yang dinormalisasi (urutan key dict tidak berpengaruh)."""
+    return json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+
+
+async def _exact(db, statement) -> int:
+    return (await db.execute(select(func.count()).select_from(statement.order_by(None).subquery()))).scalar_one()
+
+
+async def _estimate(db, statement) -> int | None:
+    """Estimasi jumlah baris: reltuples untuk tabel tanpa filter, planner rows untuk query ber-filter."""
+    if statement.whereclause is None:
+        table = statement.get_final_froms()[0]
+        estimate = (await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+            {"name": table.name},
+        )).scalar()
+    else:
+        plan = (await db.execute(Explain(statement.order_by(None)))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+
+    # reltuples = -1 berarti tabel belum pernah di-ANALYZE
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+async def count_total(db, statement, cache_key: str, strategy: str | None = None) -> tuple[int, str]:
+    """
+    Hitung total baris statement (Select) sesuai strategi, return `(total, strategy_yang_dipakai)`.
+
+    - exact: COUNT(*) setiap request
+    - cached: COUNT(*) lalu disimpan per filter selama COUNT_CACHE_TTL_SECONDS
+      (selalu dilaporkan "cached", baik hit maupun miss, supaya stabil)
+    - estimated: estimasi planner; jatuh ke exact bila hasilnya di bawah COUNT_ESTIMATE_THRESHOLD
+    """
+    strategy = strategy or settings.COUNT_STRATEGY
+    if strategy not in COUNT_STRATEGIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown count strategy '{strategy}' (expected {' | '.join(COUNT_STRATEGIES)})",
+        )
+
+    if strategy == "estimated":
+        estimate = await _estimate(db, statement)
+        if estimate is not None and estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            return estimate, "estimated"
+        return await _exact(db, statement), "exact"
+
+    if strategy == "cached":
+        cached = _count_cache.get(cache_key)
+        if cached is not None:
+            return cached, "cached"
+        total = await _exact(db, statement)
+        _count_cache.set(cache_key, total)
+        return total, "cached"
+
+    return await _exact(db, statement), "exact"
@@ -1,16 +1,37 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import get_settings
+from app.core.pool import engine_pool_options
 
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL)
+# Engine sync: dipakai seed, create_all dan Alembic (di luar request), tanpa koneksi idle
+engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+def async_database_url(url: str) -> str:
+    """postgresql:// atau postgresql+psycopg2:// → postgresql+asyncpg://"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+# Engine async: dipakai semua route supaya query tidak memblok event loop
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **engine_pool_options(settings),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
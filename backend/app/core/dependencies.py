@@ -1,21 +1,25 @@
 # app/core/dependencies.py
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.jwt import verify_access_token
 from app.core.database import get_db
-from app.models.user import User
+from app.core.config import settings
+from app.core.principal import AuthPrincipal, load_auth_state, principal_from_claims
 
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession = Depends(get_db)
+) -> AuthPrincipal:
     """
-    Dependency untuk mengambil user yang sedang login.
-    Akan raise 401 jika token invalid, expired, atau user tidak ditemukan.
+    Dependency untuk mengambil user yang sedang login (sebagai AuthPrincipal).
+    Akan raise 401 jika token invalid, expired, dicabut, atau user tidak aktif.
+
+    Identitas diambil dari klaim token; status user (aktif, token_version, role)
+    dari cache singkat atau satu query — tidak ada load objek User per request.
     """
     token = credentials.credentials
     credentials_exception = HTTPException(
@@ -25,16 +29,16 @@ def get_current_user(
     )
 
     payload = verify_access_token(token)
-    if not payload or "sub" not in payload:
+    principal = principal_from_claims(payload) if payload else None
+    if not principal:
         raise credentials_exception
 
-    user_id = payload["sub"]
-    user = db.query(User).filter(User.id == user_id).first()
+    if not settings.AUTH_REVOCATION_CHECK:
+        return principal
 
-    if not user:
+    state = await load_auth_state(db, principal.id)
+    # token terbit sebelum token_version dinaikkan (logout-all / ganti role) → ditolak
+    if not state or not state.is_active or state.token_version != payload.get("ver", 0):
         raise credentials_exception
 
-    # opsional: simpan role dari token ke objek user (jika mau dipakai langsung)
-    user.role_name = payload.get("role", getattr(user.role, "name", "user"))
-
-    return user
+    return AuthPrincipal(id=principal.id, email=state.email, role=state.role, is_active=state.is_active)
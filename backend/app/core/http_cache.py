@@ -0,0 +1,102 @@
+"""
+Helper conditional GET: ETag kuat + Last-Modified dan jawaban 304.
+Halaman list hanya memakai ETag (lihat `page_validators`).
+
+ETag diturunkan dari id + `updated_at`/`created_at` item (bukan hash body hasil
+serialisasi), sehingga validator bisa dihitung dari query kolom ringan saja.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Kolom minimum untuk menghitung validator tanpa memuat seluruh baris
+def version_columns(model):
+    return (model.id, model.created_at, model.updated_at)
+
+
+def _get(item, name):
+    return item.get(name) if isinstance(item, dict) else getattr(item, name)
+
+
+def item_version(item) -> datetime | None:
+    return _get(item, "updated_at") or _get(item, "created_at")
+
+
+def make_etag(*parts) -> str:
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return '"' + hashlib.blake2b(raw, digest_size=16).hexdigest() + '"'
+
+
+def item_validators(scope: str, item) -> tuple[str, datetime | None]:
+    """ETag + Last-Modified untuk satu entity (mis. detail produk)."""
+    version = item_version(item)
+    return make_etag(scope, str(_get(item, "id")), version), version
+
+
+def page_validators(scope: str, params: dict, page: dict) -> str:
+    """
+    ETag untuk satu halaman list: parameter request, metadata halaman (total,
+    cursor, ...) dan versi tiap item. `total_strategy` tidak ikut: sumber total
+    (hit/miss cache, estimasi) bisa berganti tanpa data berubah.
+
+    Tanpa Last-Modified: `updated_at` terbaru di halaman tidak naik saat item
+    dihapus atau item lama bergeser masuk, jadi If-Modified-Since akan salah 304.
+    """
+    versions = [(str(_get(item, "id")), item_version(item)) for item in page["items"]]
+    meta = {k: v for k, v in page.items() if k not in ("items", "total_strategy")}
+    return make_etag(scope, params, meta, versions)
+
+
+def parse_http_date(value: str) -> datetime | None:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _as_datetime(value) -> datetime | None:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def has_conditional_headers(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified=None) -> bool:
+    """
+    RFC 9110: If-None-Match (perbandingan weak) diutamakan; If-Modified-Since
+    hanya dipakai bila If-None-Match tidak dikirim.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        if "*" in candidates:
+            return True
+        return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = _as_datetime(last_modified)
+    if if_modified_since and last_modified is not None:
+        since = parse_http_date(if_modified_since)
+        if since is not None:
+            return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def validator_headers(etag: str, last_modified=None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    last_modified = _as_datetime(last_modified)
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified=None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
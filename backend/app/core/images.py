@@ -0,0 +1,230 @@
+"""
+Pipeline turunan gambar (thumbnail, medium, WebP) di luar jalur request.
+
+Setelah upload, setiap file asli diproses di process pool (resize + kompresi
+ulang adalah kerja CPU murni) dan hasilnya disimpan di samping file asli:
+
+    <stem>.<ext>                 file asli
+    <stem>.<size>.<jpg|png>      turunan format fallback
+    <stem>.<size>.webp           turunan WebP
+    <stem>.manifest.json         daftar turunan yang tersedia
+
+Semua file dengan stem yang sama dihapus bersama oleh GC storage (cache
+manifest ikut dibuang lewat `on_blobs_deleted`).
+
+`variant_path` dipakai GET /upload/{filename}?size=&format= untuk memilih file;
+selama turunan belum jadi, file asli yang dilayani.
+"""
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.storage import on_blobs_deleted, storage
+
+logger = logging.getLogger(__name__)
+
+# Nama ukuran → kotak maksimum (aspek rasio dipertahankan); "full" = ukuran asli
+VARIANT_SIZES = {"thumb": (160, 160), "medium": (640, 640), "full": None}
+VARIANT_FORMATS = ("webp",)
+MANIFEST_SUFFIX = ".manifest.json"
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def _stem(filename: str) -> str:
+    return os.path.splitext(filename)[0]
+
+
+def manifest_path(upload_dir: str, filename: str) -> str:
+    return os.path.join(upload_dir, _stem(filename) + MANIFEST_SUFFIX)
+
+
+def _write_atomic(path: str, save):
+    temp_path = f"{path}.part"
+    try:
+        save(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def generate_variants(upload_dir: str, filename: str) -> dict:
+    """
+    Buat semua turunan untuk satu file asli dan tulis manifest-nya.
+    Dijalankan di process pool, jadi hanya menerima/mengembalikan data sederhana.
+    """
+    from PIL import Image, ImageOps
+
+    # blob content-addressed: upload ulang isi yang sama tidak perlu diproses lagi,
+    # asal manifest + semua turunannya masih ada di disk (cache bisa basi setelah GC)
+    existing = _load_manifest(manifest_path(upload_dir, filename))
+    if existing and all(os.path.isfile(os.path.join(upload_dir, v["file"])) for v in existing["variants"].values()):
+        return existing
+
+    source = os.path.join(upload_dir, filename)
+    stem = _stem(filename)
+    variants: dict[str, dict] = {}
+
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        has_alpha = original.mode in ("RGBA", "LA") or "transparency" in original.info
+        fallback_ext, fallback_format = ("png", "PNG") if has_alpha else ("jpg", "JPEG")
+        base = original.convert("RGBA" if has_alpha else "RGB")
+
+        for size, box in VARIANT_SIZES.items():
+            image = base.copy()
+            if box:
+                image.thumbnail(box, Image.Resampling.LANCZOS)
+
+            targets = [("webp", "WEBP", {"quality": WEBP_QUALITY, "method": 4})]
+            if box:  # ukuran penuh format fallback = file asli itu sendiri
+                options = {"optimize": True} if fallback_format == "PNG" else {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}
+                targets.append((fallback_ext, fallback_format, options))
+
+            for ext, fmt, options in targets:
+                name = f"{stem}.{size}.{ext}"
+                _write_atomic(
+                    os.path.join(upload_dir, name),
+                    lambda path: image.save(path, format=fmt, **options),
+                )
+                key = size if ext == fallback_ext else f"{size}.{ext}"
+                variants[key] = {
+                    "file": name,
+                    "width": image.width,
+                    "height": image.height,
+                    "bytes": os.path.getsize(os.path.join(upload_dir, name)),
+                }
+
+        manifest = {
+            "source": filename,
+            "width": original.width,
+            "height": original.height,
+            "variants": variants,
+        }
+
+    _write_atomic(manifest_path(upload_dir, filename), lambda path: _save_json(path, manifest))
+    return manifest
+
+
+def _save_json(path: str, data: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+# Manifest tidak berubah setelah ditulis; hanya hasil positif yang di-cache
+_manifest_cache = TTLCache(maxsize=2048, ttl=3600, name="image_manifest")
+
+
+def _load_manifest(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def read_manifest(upload_dir: str, filename: str) -> dict | None:
+    path = manifest_path(upload_dir, filename)
+    manifest = _manifest_cache.get(path)
+    if manifest is not None:
+        return manifest
+    manifest = _load_manifest(path)
+    if manifest is not None:
+        _manifest_cache.set(path, manifest)
+    return manifest
+
+
+@on_blobs_deleted
+def _forget_manifests(stems: set[str]):
+    if storage.is_local:
+        for stem in stems:
+            _manifest_cache.delete(os.path.join(storage.directory, stem + MANIFEST_SUFFIX))
+
+
+def variant_path(upload_dir: str, filename: str, size: str | None, format: str | None) -> tuple[str, bool]:
+    """
+    Path file untuk ukuran/format yang diminta + apakah itu persis varian yang diminta.
+    Fallback ke file asli (False) bila turunan belum tersedia atau sudah dihapus
+    (manifest di cache worker lain bisa masih menyebutnya setelah GC).
+    """
+    original = os.path.join(upload_dir, filename)
+    if not size and not format:
+        return original, True
+
+    manifest = read_manifest(upload_dir, filename)
+    if not manifest:
+        return original, False
+
+    key = size or "full"
+    if format:
+        key = f"{key}.{format}"
+    variant = manifest["variants"].get(key)
+    if not variant:
+        return original, False
+    path = os.path.join(upload_dir, variant["file"])
+    if not os.path.isfile(path):
+        _manifest_cache.delete(manifest_path(upload_dir, filename))
+        return original, False
+    return path, True
+
+
+def variant_urls(url: str) -> dict:
+    """URL turunan untuk satu URL gambar produk (tanpa akses disk)."""
+    if not url.startswith("/upload/"):
+        return {"original": url}
+    urls = {"original": url}
+    for fmt in VARIANT_FORMATS:
+        urls[fmt] = f"{url}?format={fmt}"
+    for size in VARIANT_SIZES:
+        if size == "full":
+            continue
+        urls[size] = f"{url}?size={size}"
+        for fmt in VARIANT_FORMATS:
+            urls[f"{size}_{fmt}"] = f"{url}?size={size}&format={fmt}"
+    return urls
+
+
+# ==========================================
+# ⚙️ Process pool
+# ==========================================
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMAGE_PIPELINE_WORKERS)
+    return _executor
+
+
+def shutdown_image_pipeline():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def process_uploads(filenames: list[str]):
+    """
+    Background task: buat turunan untuk semua file secara paralel di process pool.
+    Kegagalan satu file hanya dicatat di log (file asli tetap dilayani).
+    Hanya untuk storage lokal; di backend S3 file asli yang dilayani.
+    """
+    if not settings.IMAGE_PIPELINE_ENABLED or not filenames or not storage.is_local:
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    results = await asyncio.gather(
+        *[loop.run_in_executor(executor, generate_variants, storage.directory, name) for name in dict.fromkeys(filenames)],
+        return_exceptions=True,
+    )
+    for name, result in zip(dict.fromkeys(filenames), results):
+        if isinstance(result, BaseException):
+            logger.warning(f"⚠️ Image variants failed for {name}: {result!r}")
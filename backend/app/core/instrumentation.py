@@ -0,0 +1,259 @@
+"""
+Metrik aplikasi untuk /metrics (format teks Prometheus).
+
+- HTTP: jumlah request per method/route template/status, histogram latency,
+  jumlah request yang sedang berjalan.
+- DB: jumlah dan durasi statement (event engine SQLAlchemy), plus jumlah query
+  dan total waktu DB per request (dihitung lewat contextvar per request).
+- bcrypt, connection pool, hit/miss cache (TTLCache ber-`name`) dan penolakan
+  rate limit disalin dari statistik yang sudah ada saat snapshot.
+
+Multi-worker: bila METRICS_MULTIPROC_DIR diisi, tiap worker menulis snapshot-nya
+ke `<dir>/<pid>.json` secara berkala; /metrics (worker mana pun) menjumlahkan semua
+file. Gauge dari worker yang sudah mati diabaikan, counter/histogram tetap dihitung.
+Kosongkan direktori itu setiap kali server di-start.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import named_caches
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.metrics import Registry, merge_snapshots, render_text
+from app.core.pool import pool_metrics
+from app.core.product_cache import product_cache
+from app.core.rate_limit import rejections as rate_limit_rejections
+from app.core.request_logging import route_template
+from app.core.security import password_hasher
+
+logger = logging.getLogger(__name__)
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "Jumlah request HTTP", ("method", "route", "status")
+)
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Latency request HTTP sampai body terakhir terkirim", ("method", "route")
+)
+http_in_flight = registry.gauge("http_requests_in_flight", "Request HTTP yang sedang diproses").labels()
+
+db_queries = registry.counter("db_queries_total", "Jumlah statement SQL yang dieksekusi").labels()
+db_query_duration = registry.histogram("db_query_duration_seconds", "Durasi per statement SQL").labels()
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request", "Jumlah statement SQL per request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+db_time_per_request = registry.histogram(
+    "db_time_per_request_seconds", "Total waktu SQL per request", ("route",)
+)
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Koneksi pool yang sedang dipinjam").labels()
+registry.histogram("db_pool_checkout_wait_seconds", "Lama menunggu koneksi dari pool").attach(pool_metrics.checkout_wait)
+
+registry.histogram("password_hash_duration_seconds", "Durasi bcrypt hash/verify").attach(password_hasher.duration)
+registry.histogram("password_hash_queue_wait_seconds", "Lama antre executor bcrypt").attach(password_hasher.queue_wait)
+
+cache_hits = registry.counter("cache_hits_total", "Cache hit per cache in-process", ("cache",))
+cache_misses = registry.counter("cache_misses_total", "Cache miss per cache in-process", ("cache",))
+rate_limited = registry.counter("rate_limited_total", "Request yang ditolak 429 per policy rate limit", ("policy",))
+
+
+@registry.collector
+def _collect_stats():
+    for name, cache in list(named_caches.items()):
+        cache_hits.labels(name).set(cache.hits)
+        cache_misses.labels(name).set(cache.misses)
+    if product_cache.shared is not None:
+        cache_hits.labels("products_shared").set(product_cache.shared_hits)
+        cache_misses.labels("products_shared").set(product_cache.shared_misses)
+    for policy, count in list(rate_limit_rejections.items()):
+        rate_limited.labels(policy).set(count)
+    db_pool_checked_out.set(async_engine.pool.checkedout())
+
+
+# ==========================================
+# 🗃️ Statistik DB per request
+# ==========================================
+class RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: contextvars.ContextVar[RequestDBStats | None] = contextvars.ContextVar(
+    "request_db_stats", default=None
+)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    db_queries.inc()
+    db_query_duration.observe(elapsed)
+    # greenlet SQLAlchemy async mewarisi context task → contextvar request terlihat di sini
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+@event.listens_for(async_engine.sync_engine, "handle_error")
+def _handle_error(context):
+    # statement gagal: after_cursor_execute tidak dipanggil, buang waktu mulainya
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+# ==========================================
+# 🧭 Middleware HTTP
+# ==========================================
+def route_label(scope) -> str:
+    """Template route; mount (mis. /upload static) → `<mount>/{path}`; sisanya `<unmatched>`."""
+    route = route_template(scope)
+    if route:
+        return route
+    if scope.get("root_path"):
+        return scope["root_path"] + "/{path}"
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI: catat count, latency, in-flight dan statistik DB per request.
+    Dicatat saat body terakhir terkirim: BackgroundTasks (resize gambar, GC
+    storage) berjalan setelahnya di dalam pemanggilan app yang sama dan tidak
+    boleh ikut terhitung sebagai latency request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+        http_in_flight.inc()
+        started = time.perf_counter()
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            route = route_label(scope)
+            http_requests.labels(scope["method"], route, status_code).inc()
+            http_duration.labels(scope["method"], route).observe(elapsed)
+            db_queries_per_request.labels(route).observe(stats.queries)
+            db_time_per_request.labels(route).observe(stats.seconds)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_db_stats.reset(token)
+            record()  # exception / tanpa response: catat di sini
+
+
+# ==========================================
+# 👥 Agregasi antar worker
+# ==========================================
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(directory: str):
+    """Tulis snapshot worker ini secara atomik ke `<dir>/<pid>.json`."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(registry.snapshot(), fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def read_snapshots(directory: str) -> list[dict]:
+    snapshots = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path, encoding="utf-8") as fh:
+                snapshot = json.load(fh)
+        except (OSError, ValueError):
+            continue  # sedang ditulis ulang / rusak: lewati scrape ini
+        pid = int(entry.name.split(".", 1)[0]) if entry.name.split(".", 1)[0].isdigit() else None
+        if pid is not None and not _pid_alive(pid):
+            snapshot = {name: family for name, family in snapshot.items() if family["type"] != "gauge"}
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def metrics_text() -> str:
+    """Teks /metrics: worker ini saja, atau gabungan semua worker bila multiproc aktif."""
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return render_text(registry.snapshot())
+    write_snapshot(directory)
+    return render_text(merge_snapshots(read_snapshots(directory)))
+
+
+_flush_task: asyncio.Task | None = None
+
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL_SECONDS)
+        try:
+            await run_in_threadpool(write_snapshot, settings.METRICS_MULTIPROC_DIR)
+        except Exception:
+            logger.exception("💥 Metrics snapshot failed")
+
+
+async def start_metrics_flush():
+    global _flush_task
+    if settings.METRICS_MULTIPROC_DIR and _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop_metrics_flush():
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        _flush_task = None
+    if settings.METRICS_MULTIPROC_DIR:
+        # snapshot terakhir: counter worker ini tetap terhitung setelah ia berhenti
+        write_snapshot(settings.METRICS_MULTIPROC_DIR)
@@ -1,6 +1,10 @@
 from app.core.config import settings
+from app.core.cache import TTLCache
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from jose import jwt, JWTError
+import hashlib
+import time
 
 ALGORITHM = "HS256"
 
@@ -17,13 +21,27 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
-def verify_access_token(token: str):
-    """
-    Memverifikasi JWT access token dan mengembalikan payload.
-    Jika token invalid atau expired, return None.
-    """
+# ==========================================
+# ⚡ Cache token yang sudah diverifikasi
+# ==========================================
+# Client yang sama mengirim bearer token yang sama berkali-kali; decode + HMAC
+# cukup sekali per token. Key = fingerprint secret + digest token, jadi setelah
+# secret dirotasi entry lama tidak pernah cocok lagi (dan habis oleh LRU/TTL).
+_verified_tokens = TTLCache(maxsize=max(1, settings.JWT_VERIFY_CACHE_MAX_ENTRIES), ttl=settings.JWT_VERIFY_CACHE_MAX_TTL_SECONDS, name="jwt")
+
+
+@lru_cache(maxsize=8)
+def _secret_fingerprint(secret: str) -> bytes:
+    return hashlib.blake2b(secret.encode("utf-8"), digest_size=16).digest()
+
+
+def _token_cache_key(token: str, secret: str) -> bytes:
+    return _secret_fingerprint(secret) + hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+
+
+def _decode(token: str, secret: str):
     try:
-        payload = jwt.decode(token, settings.ACCESS_SECRET, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, secret, algorithms=[ALGORITHM])
         # Optional check: pastikan token belum kedaluwarsa
         exp = payload.get("exp")
         if exp and datetime.now(timezone.utc).timestamp() > exp:
@@ -31,3 +49,52 @@ def verify_access_token(token: str):
         return payload
     except JWTError:
         return None
+
+
+def verify_access_token(token: str):
+    """
+    Memverifikasi JWT access token dan mengembalikan payload.
+    Jika token invalid atau expired, return None.
+    """
+    secret = settings.ACCESS_SECRET
+    if settings.JWT_VERIFY_CACHE_MAX_ENTRIES <= 0:
+        return _decode(token, secret)
+
+    key = _token_cache_key(token, secret)
+    cached = _verified_tokens.get(key)
+    if cached is not None:
+        exp, payload = cached
+        # TTL cache memakai jam monotonic; exp tetap dicek terhadap jam dinding
+        if exp is None or time.time() <= exp:
+            return dict(payload)
+        _verified_tokens.delete(key)
+        return None
+
+    payload = _decode(token, secret)
+    if payload is None:
+        return None  # token invalid tidak di-cache
+
+    exp = payload.get("exp")
+    ttl = settings.JWT_VERIFY_CACHE_MAX_TTL_SECONDS
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _verified_tokens.set(key, (exp, dict(payload)), ttl=ttl)
+    return payload
+
+
+def clear_token_cache():
+    """Kosongkan cache token (mis. setelah rotasi secret via reload settings)."""
+    _verified_tokens.clear()
+
+
+def token_cache_stats() -> dict:
+    lookups = _verified_tokens.hits + _verified_tokens.misses
+    return {
+        "enabled": settings.JWT_VERIFY_CACHE_MAX_ENTRIES > 0,
+        "entries": len(_verified_tokens),
+        "max_entries": settings.JWT_VERIFY_CACHE_MAX_ENTRIES,
+        "hits": _verified_tokens.hits,
+        "misses": _verified_tokens.misses,
+        "hit_ratio": round(_verified_tokens.hits / lookups, 4) if lookups else None,
+    }
@@ -0,0 +1,168 @@
+import bisect
+import threading
+
+# Bucket latency default dalam detik
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histogram kumulatif sederhana (gaya Prometheus), aman dipakai antar thread."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # slot terakhir = +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        cumulative, running = {}, 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+            running += count
+            cumulative[bound] = running
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+# ==========================================
+# 📈 Registry + format teks Prometheus
+# ==========================================
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Value:
+    """Nilai counter/gauge satu kombinasi label."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        # untuk counter: mencerminkan total yang sudah dihitung di tempat lain (mis. TTLCache.hits)
+        self.value = value
+
+
+class MetricFamily:
+    """Satu metrik + label-nya. `labels(...)` membuat child per kombinasi nilai label."""
+
+    def __init__(self, name: str, help: str, kind: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind  # counter | gauge | histogram
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(
+                    key, Histogram(self.buckets) if self.kind == "histogram" else _Value()
+                )
+        return child
+
+    def attach(self, histogram: Histogram, *values):
+        """Pakai Histogram yang sudah ada (mis. PasswordHasher.duration) sebagai child."""
+        self._children[tuple(str(v) for v in values)] = histogram
+
+    def snapshot(self) -> dict:
+        samples = {}
+        for key, child in list(self._children.items()):
+            samples["\x1f".join(key)] = child.snapshot() if self.kind == "histogram" else child.value
+        return {"help": self.help, "type": self.kind, "labelnames": list(self.labelnames), "samples": samples}
+
+
+class Registry:
+    def __init__(self):
+        self._families: dict[str, MetricFamily] = {}
+        self._collectors = []
+
+    def _add(self, family: MetricFamily) -> MetricFamily:
+        return self._families.setdefault(family.name, family)
+
+    def counter(self, name: str, help: str, labelnames=()) -> MetricFamily:
+        return self._add(MetricFamily(name, help, "counter", labelnames))
+
+    def gauge(self, name: str, help: str, labelnames=()) -> MetricFamily:
+        return self._add(MetricFamily(name, help, "gauge", labelnames))
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> MetricFamily:
+        return self._add(MetricFamily(name, help, "histogram", labelnames, buckets))
+
+    def collector(self, fn):
+        """Decorator: fungsi yang menyalin statistik lain ke metrik tepat sebelum snapshot."""
+        self._collectors.append(fn)
+        return fn
+
+    def snapshot(self) -> dict:
+        for collect in self._collectors:
+            collect()
+        return {name: family.snapshot() for name, family in self._families.items()}
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """Jumlahkan snapshot beberapa proses worker (counter, gauge, bucket histogram)."""
+    merged: dict = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "samples": {}})
+            for key, value in family["samples"].items():
+                current = target["samples"].get(key)
+                if family["type"] != "histogram":
+                    target["samples"][key] = (current or 0) + value
+                elif current is None:
+                    target["samples"][key] = {**value, "buckets": dict(value["buckets"])}
+                else:
+                    for bound, count in value["buckets"].items():
+                        current["buckets"][bound] = current["buckets"].get(bound, 0) + count
+                    current["count"] += value["count"]
+                    current["sum"] += value["sum"]
+    return merged
+
+
+def render_text(snapshot: dict) -> str:
+    """Snapshot → format eksposisi teks Prometheus 0.0.4."""
+    lines = []
+    for name, family in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for key, value in sorted(family["samples"].items()):
+            labels = dict(zip(family["labelnames"], key.split("\x1f") if family["labelnames"] else []))
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for bound, count in value["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, asc, desc, false, or_
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Satu kunci urutan: nama (untuk signature cursor), ekspresi SQL, dan arah."""
+    name: str
+    expr: object
+    direction: str = "asc"  # asc | desc
+
+    def clause(self):
+        return asc(self.expr) if self.direction == "asc" else desc(self.expr)
+
+    def reversed(self) -> "SortKey":
+        return SortKey(self.name, self.expr, "desc" if self.direction == "asc" else "asc")
+
+
+@dataclass
+class KeysetWindow:
+    keys: list[SortKey]
+    limit: int
+    has_cursor: bool
+    backwards: bool
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str | None
+    prev_cursor: str | None
+
+
+# ==========================================
+# 🔐 Cursor encoding (opaque base64 JSON)
+# ==========================================
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+        raise ValueError("unknown cursor value")
+    return value
+
+
+def _signature(keys: list[SortKey]) -> list[str]:
+    return [f"{k.name}:{k.direction}" for k in keys]
+
+
+def encode_cursor(values, keys: list[SortKey], backwards: bool = False) -> str:
+    payload = {
+        "s": _signature(keys),
+        "v": [_dump_value(v) for v in values],
+        "b": backwards,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: list[SortKey]) -> tuple[list, bool]:
+    """
+    Decode cursor dan pastikan cursor dibuat untuk urutan yang sama.
+    Raise 400 jika cursor rusak atau tidak cocok dengan sort saat ini.
+    """
+    invalid = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_load_value(v) for v in payload["v"]]
+        backwards = bool(payload.get("b", False))
+        signature = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise invalid
+
+    if signature != _signature(keys) or len(values) != len(keys):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor does not match the requested sort",
+        )
+    return values, backwards
+
+
+# ==========================================
+# 📑 Keyset predicate
+# ==========================================
+# Postgres default: ASC → NULLS LAST, DESC → NULLS FIRST. Membalik arah
+# (untuk prev page) tetap konsisten dengan default tersebut.
+def _nullable(key: SortKey) -> bool:
+    column = getattr(key.expr, "expression", key.expr)
+    return getattr(column, "nullable", True)
+
+
+def _equal(key: SortKey, value):
+    return key.expr.is_(None) if value is None else key.expr == value
+
+
+def _after(key: SortKey, value):
+    if key.direction == "asc":
+        if value is None:
+            return false()
+        if not _nullable(key):
+            return key.expr > value
+        return or_(key.expr > value, key.expr.is_(None))
+    if value is None:
+        return key.expr.isnot(None)
+    return key.expr < value
+
+
+def keyset_predicate(keys: list[SortKey], values: list):
+    """(k1, k2, ...) > (v1, v2, ...) secara leksikografis, sesuai arah tiap kunci."""
+    clauses = []
+    for i, key in enumerate(keys):
+        equals = [_equal(k, v) for k, v in zip(keys[:i], values[:i])]
+        clauses.append(and_(*equals, _after(key, values[i])))
+    return or_(*clauses)
+
+
+def keyset_query(query, keys: list[SortKey], tiebreaker: SortKey, limit: int, cursor: str | None = None):
+    """
+    Siapkan query untuk satu halaman keyset pagination.
+
+    `keys` adalah urutan yang diminta client; `tiebreaker` (biasanya primary key)
+    ditambahkan di akhir supaya urutan total dan cursor selalu unik.
+    Nilai kunci ikut di-select sebagai kolom tambahan sehingga ekspresi non-kolom
+    juga bisa dipakai. Hasil query diteruskan ke `keyset_page` bersama window-nya.
+    """
+    keys = [*keys, tiebreaker]
+    values, backwards = decode_cursor(cursor, keys) if cursor else (None, False)
+    order = [k.reversed() for k in keys] if backwards else keys
+
+    query = query.add_columns(*[k.expr.label(f"_k{i}") for i, k in enumerate(keys)])
+    if values is not None:
+        query = query.filter(keyset_predicate(order, values))
+    query = query.order_by(None).order_by(*[k.clause() for k in order]).limit(limit + 1)
+
+    return query, KeysetWindow(keys=keys, limit=limit, has_cursor=values is not None, backwards=backwards)
+
+
+def keyset_page(rows, window: "KeysetWindow") -> KeysetPage:
+    """
+    Potong hasil `keyset_query` menjadi item + cursor next/prev.
+    Query satu entity menghasilkan entity-nya; query multi-kolom menghasilkan
+    Row apa adanya (kolom `_k*` ikut terbawa, akses tetap lewat nama kolom).
+    """
+    rows = list(rows)
+    has_more = len(rows) > window.limit
+    rows = rows[:window.limit]
+    if window.backwards:
+        rows.reverse()
+
+    n = len(window.keys)
+    items = [row[0] if len(row) - n == 1 else row for row in rows]
+    if not rows:
+        return KeysetPage(items=items, next_cursor=None, prev_cursor=None)
+
+    first_key, last_key = tuple(rows[0][-n:]), tuple(rows[-1][-n:])
+    has_next = True if window.backwards else has_more
+    has_prev = has_more if window.backwards else window.has_cursor
+
+    return KeysetPage(
+        items=items,
+        next_cursor=encode_cursor(last_key, window.keys) if has_next else None,
+        prev_cursor=encode_cursor(first_key, window.keys, backwards=True) if has_prev else None,
+    )
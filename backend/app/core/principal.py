@@ -0,0 +1,92 @@
+"""
+Principal auth yang dibangun dari klaim access token.
+
+Access token sudah membawa id, email dan role, jadi request terautentikasi tidak
+perlu memuat ulang User. Yang tetap dicek ke DB hanya status token (user masih
+aktif, `token_version` belum dinaikkan, role terbaru) — hasilnya di-cache singkat
+per worker, sehingga request biasanya tanpa query dan paling banyak satu query.
+"""
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.role import Role
+from app.models.user import User
+
+# Role untuk user tanpa role_id (sama dengan klaim `role` yang diterbitkan login)
+DEFAULT_ROLE = "user"
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """User yang sedang login, tanpa objek ORM (tidak terikat ke session)."""
+    id: UUID
+    email: str
+    role: str
+    is_active: bool = True
+
+
+@dataclass(frozen=True)
+class AuthState:
+    """Potongan data user yang menentukan apakah token masih berlaku."""
+    email: str
+    role: str
+    is_active: bool
+    token_version: int
+
+
+_auth_state_cache = TTLCache(maxsize=settings.AUTH_STATE_CACHE_MAX_ENTRIES, ttl=settings.AUTH_STATE_CACHE_TTL_SECONDS, name="auth_state")
+
+
+async def load_auth_state(db: AsyncSession, user_id: UUID) -> AuthState | None:
+    """Status auth user: dari cache, atau satu query (users LEFT JOIN roles)."""
+    if settings.AUTH_STATE_CACHE_TTL_SECONDS > 0:
+        cached = _auth_state_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+    row = (await db.execute(
+        select(User.email, User.is_active, User.token_version, Role.name)
+        .outerjoin(Role, User.role_id == Role.id)
+        .where(User.id == user_id)
+    )).one_or_none()
+    if row is None:
+        return None
+
+    state = AuthState(email=row.email, role=row.name or DEFAULT_ROLE, is_active=bool(row.is_active), token_version=row.token_version)
+    if settings.AUTH_STATE_CACHE_TTL_SECONDS > 0:
+        _auth_state_cache.set(user_id, state)
+    return state
+
+
+def forget_auth_state(user_id: UUID):
+    """Buang cache status user di worker ini (worker lain menyusul setelah TTL)."""
+    _auth_state_cache.delete(user_id)
+
+
+async def revoke_tokens(db: AsyncSession, user_id: UUID):
+    """Naikkan token_version: semua access/refresh token user yang sudah terbit jadi tidak berlaku."""
+    await db.execute(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+    )
+    await db.commit()
+    forget_auth_state(user_id)
+
+
+def principal_from_claims(payload: dict) -> AuthPrincipal | None:
+    """Principal murni dari klaim token (tanpa DB); None jika klaim wajib tidak valid."""
+    try:
+        user_id = UUID(str(payload["sub"]))
+    except (KeyError, ValueError):
+        return None
+    return AuthPrincipal(id=user_id, email=payload.get("email", ""), role=payload.get("role") or DEFAULT_ROLE)
+
+
+def access_claims(user: User) -> dict:
+    """Klaim access token (role harus sudah di-load); `ver` dicocokkan dengan User.token_version."""
+    role_name = user.role.name if user.role else DEFAULT_ROLE
+    return {"sub": str(user.id), "email": user.email, "role": role_name, "ver": user.token_version or 0}
@@ -0,0 +1,108 @@
+"""
+Update massal produk secara set-based.
+
+Item dikelompokkan per kombinasi field yang diubah; tiap kelompok menjadi satu
+`UPDATE products SET ... FROM (VALUES ...) AS v WHERE products.id = v.id`,
+semuanya dalam satu transaksi. Field tiap item divalidasi terpisah dan
+statement yang ditolak database dipecah sampai baris penyebabnya ketemu, jadi
+kegagalan dilaporkan per item. Update berbasis filter memakai grammar
+FilterField yang sama dengan /products/search (whitelist + index).
+"""
+from pydantic import ValidationError
+from sqlalchemy import column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.exc import DBAPIError
+
+from app.core.advanced_query import compile_filters
+from app.models.product import Product
+from app.schemas.product import ProductPatch
+
+# Satu VALUES per statement dibatasi jumlah bind parameter asyncpg (32767)
+MAX_BIND_PARAMS = 30000
+
+
+def _validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+
+def _values_update(names: tuple[str, ...], rows: list[dict]):
+    source = values(
+        column("id", UUID(as_uuid=True)),
+        *[column(name, Product.__table__.c[name].type) for name in names],
+        name="v",
+    ).data([tuple(row[key] for key in ("id", *names)) for row in rows])
+    return (
+        update(Product)
+        .where(Product.id == source.c.id)
+        .values({**{name: source.c[name] for name in names}, "updated_at": func.now()})
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _apply_rows(db, names, rows: list[tuple[int, dict]], outcomes: list[dict]) -> set:
+    """
+    Satu UPDATE ... FROM (VALUES ...) di dalam savepoint. Ditolak database
+    (mis. SKU bentrok) → baris dibelah dua dan diulang, sampai hanya item
+    penyebabnya yang ditandai invalid; sisa batch tetap tertulis.
+    """
+    try:
+        async with db.begin_nested():
+            return set((await db.execute(_values_update(names, [row for _, row in rows]))).scalars().all())
+    except DBAPIError as exc:
+        if len(rows) == 1:
+            index = rows[0][0]
+            message = str(exc.orig).splitlines()[0] if exc.orig else str(exc)
+            outcomes[index].update(status="invalid", error=f"rejected by database: {message}")
+            return set()
+    middle = len(rows) // 2
+    return (
+        await _apply_rows(db, names, rows[:middle], outcomes)
+        | await _apply_rows(db, names, rows[middle:], outcomes)
+    )
+
+
+async def batch_update(db, items) -> list[dict]:
+    """Terapkan daftar ProductPatchItem; return outcome per item (urutan sama dengan input)."""
+    outcomes: list[dict] = [{"id": str(item.id), "status": "pending"} for item in items]
+    groups: dict[tuple[str, ...], list[tuple[int, dict]]] = {}
+    seen = set()
+
+    for index, item in enumerate(items):
+        if item.id in seen:
+            outcomes[index].update(status="invalid", error="duplicate id in batch")
+            continue
+        seen.add(item.id)
+        try:
+            fields = ProductPatch.model_validate(item.model_extra or {}).model_dump(exclude_unset=True)
+        except ValidationError as exc:
+            outcomes[index].update(status="invalid", error=_validation_error(exc))
+            continue
+        if not fields:
+            outcomes[index].update(status="invalid", error="no fields to update")
+            continue
+        groups.setdefault(tuple(sorted(fields)), []).append((index, {"id": item.id, **fields}))
+
+    updated_ids = set()
+    for names, rows in groups.items():
+        chunk_size = max(1, MAX_BIND_PARAMS // (len(names) + 1))
+        for start in range(0, len(rows), chunk_size):
+            updated_ids |= await _apply_rows(db, names, rows[start:start + chunk_size], outcomes)
+
+    for index, item in enumerate(items):
+        if outcomes[index]["status"] == "pending":
+            outcomes[index]["status"] = "updated" if item.id in updated_ids else "not_found"
+    return outcomes
+
+
+async def filter_update(db, filters, patch) -> int:
+    """UPDATE ... WHERE <filter whitelist>; return jumlah baris yang berubah."""
+    fields = patch.model_dump(exclude_unset=True)
+    statement = (
+        update(Product)
+        .where(compile_filters(filters))
+        .values(**fields, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(statement)
+    return result.rowcount
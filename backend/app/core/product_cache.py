@@ -0,0 +1,41 @@
+from app.core.cache import ResponseCache, TTLCache, backend_from_url
+from app.core.catalog import on_products_changed
+from app.core.config import settings
+
+# "v2": `data` disimpan sebagai JSON string (bukan dict) sejak response list/detail di-serialize sekali
+product_cache = ResponseCache(
+    namespace="products:v2",
+    local=TTLCache(
+        maxsize=settings.RESPONSE_CACHE_LOCAL_MAX_ENTRIES,
+        ttl=settings.RESPONSE_CACHE_LOCAL_TTL_SECONDS,
+        name="products",
+    ),
+    shared=backend_from_url(settings.RESPONSE_CACHE_SHARED_URL),
+    shared_ttl=settings.RESPONSE_CACHE_SHARED_TTL_SECONDS,
+    generation_ttl=settings.RESPONSE_CACHE_GENERATION_TTL_SECONDS,
+)
+
+
+# Generation terpisah untuk detail: hanya naik saat banyak produk berubah sekaligus
+DETAIL_GENERATION = "detail-generation"
+
+
+async def detail_key(product_id) -> str:
+    return product_cache.key("detail", f"g{await product_cache.generation(DETAIL_GENERATION)}", product_id)
+
+
+async def list_key(**params) -> str:
+    """Key halaman list dari parameter yang sudah dinormalisasi, plus generation katalog."""
+    normalized = "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] is not None)
+    return product_cache.key("list", f"g{await product_cache.generation()}", normalized)
+
+
+@on_products_changed
+async def _invalidate_product_responses(product_id=None):
+    # Halaman list mana pun bisa memuat produk ini → ganti generation;
+    # detail cukup dihapus per id, atau semuanya untuk perubahan massal (import/batch).
+    await product_cache.bump_generation()
+    if product_id is not None:
+        await product_cache.delete(await detail_key(product_id))
+    else:
+        await product_cache.bump_generation(DETAIL_GENERATION)
@@ -0,0 +1,121 @@
+"""
+Whitelist deklaratif field Product yang boleh dipakai API search.
+
+Setiap field menyebut operator yang diizinkan, tipe value (untuk koersi sekali
+di awal request, bukan per baris) dan index yang melayaninya. Field di luar
+registry ditolak supaya client tidak bisa memicu scan tanpa index.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from app.models.product import Product
+
+OPERATORS = ("eq", "like", "gt", "lt", "between")
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    column: object
+    type: type
+    operators: frozenset
+    sortable: bool = False
+    searchable: bool = False
+    index: str | None = None  # None: hanya sebagai filter tambahan (residual), tanpa index sendiri
+
+    def coerce(self, value):
+        """Konversi value dari JSON ke tipe kolom. Raise ValueError jika tidak valid."""
+        if value is None:
+            raise ValueError("value is required")
+        if self.type is datetime:
+            return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+        if self.type is Decimal:
+            try:
+                return Decimal(str(value))
+            except InvalidOperation:
+                raise ValueError(f"'{value}' is not a number")
+        if self.type is int and isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"'{value}' is not an integer")
+        return self.type(value)
+
+
+PRODUCT_FIELDS: dict[str, FieldSpec] = {
+    "name": FieldSpec(
+        Product.name, str, frozenset({"eq", "like"}),
+        sortable=True, searchable=True, index="ix_products_name_trgm",
+    ),
+    "description": FieldSpec(
+        Product.description, str, frozenset(),
+        searchable=True, index="ix_products_search_vector",
+    ),
+    "category": FieldSpec(
+        Product.category, str, frozenset({"eq"}),
+        sortable=True, index="ix_products_category_status_price",
+    ),
+    "status": FieldSpec(
+        Product.status, str, frozenset({"eq"}),
+        index="ix_products_status_created_at",
+    ),
+    "price": FieldSpec(
+        Product.price, Decimal, frozenset({"eq", "gt", "lt", "between"}),
+        sortable=True, index="ix_products_price_id",
+    ),
+    "created_at": FieldSpec(
+        Product.created_at, datetime, frozenset({"gt", "lt", "between"}),
+        sortable=True, index="ix_products_created_at_id",
+    ),
+    "sku": FieldSpec(Product.sku, str, frozenset({"eq"}), index="ix_products_sku"),
+    "stock": FieldSpec(Product.stock, int, frozenset({"eq", "gt", "lt", "between"})),
+    "discount": FieldSpec(Product.discount, float, frozenset({"eq", "gt", "lt", "between"})),
+}
+
+SORTABLE_FIELDS = sorted(name for name, spec in PRODUCT_FIELDS.items() if spec.sortable)
+SEARCHABLE_FIELDS = sorted(name for name, spec in PRODUCT_FIELDS.items() if spec.searchable)
+
+
+# ==========================================
+# 🧾 Projection: kolom yang di-fetch untuk response list/search
+# ==========================================
+# Field output yang bisa diminta lewat `fields=` (image_variants dihitung dari images)
+OUTPUT_FIELDS = (
+    "id", "sku", "name", "category", "description", "price", "stock", "discount",
+    "status", "images", "created_at", "updated_at", "image_variants",
+)
+# View "card": tanpa description (teks panjang) untuk grid/list produk
+CARD_FIELDS = tuple(name for name in OUTPUT_FIELDS if name != "description")
+# Selalu di-fetch: ETag/Last-Modified per item butuh id + timestamp
+VALIDATOR_COLUMNS = ("id", "created_at", "updated_at")
+VIEWS = {"full": None, "card": CARD_FIELDS}
+
+
+def resolve_fieldset(view: str | None = None, fields=None) -> tuple[str, ...] | None:
+    """`fields` (list atau "a,b,c") / `view` → tuple field output; None = ProductOut lengkap."""
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+    if fields:
+        unknown = sorted(set(fields) - set(OUTPUT_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown field(s) {unknown}; allowed: {', '.join(OUTPUT_FIELDS)}")
+        return tuple(name for name in OUTPUT_FIELDS if name in fields)
+    if (view or "full") not in VIEWS:
+        raise ValueError(f"Unknown view '{view}'; allowed: {', '.join(VIEWS)}")
+    return VIEWS[view or "full"]
+
+
+def projection_columns(fieldset: tuple[str, ...] | None) -> tuple:
+    """Kolom Product yang perlu di-select untuk fieldset (None = semua kolom ProductOut)."""
+    names = set(OUTPUT_FIELDS if fieldset is None else fieldset) | set(VALIDATOR_COLUMNS)
+    if "image_variants" in names:
+        names.add("images")
+    return tuple(getattr(Product, name) for name in OUTPUT_FIELDS if name in names and name != "image_variants")
+
+
+def _check_declared_indexes():
+    declared = {spec.index for spec in PRODUCT_FIELDS.values() if spec.index}
+    existing = {index.name for index in Product.__table__.indexes}
+    missing = declared - existing
+    if missing:
+        raise RuntimeError(f"Product field registry references unknown indexes: {sorted(missing)}")
+
+
+_check_declared_indexes()
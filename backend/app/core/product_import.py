@@ -0,0 +1,283 @@
+"""
+Import/export massal produk.
+
+Import membaca body NDJSON/CSV secara streaming, memvalidasi baris per batch
+dengan ProductCreate, lalu menulis `INSERT ... ON CONFLICT (sku)` multi-row
+per batch (dipecah sesuai batas bind parameter asyncpg; satu commit per batch,
+bukan per produk). Saat SKU sudah ada, hanya kolom yang diisi di baris import
+yang ditimpa; kolom yang tidak ada / sel kosong mempertahankan nilai lama. Statement yang ditolak database dipecah sampai baris
+penyebabnya ketemu, jadi error dilaporkan per baris.
+Export mengalir dari server-side cursor sehingga tabel tidak pernah dimuat utuh.
+"""
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import ValidationError
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+
+from app.core.database import AsyncSessionLocal
+from app.core.product_batch import MAX_BIND_PARAMS
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+
+EXPORT_COLUMNS = (
+    "id", "sku", "name", "category", "description", "images",
+    "stock", "price", "discount", "status", "created_at", "updated_at",
+)
+# Kolom yang boleh ditimpa saat SKU sudah ada (id, created_by, created_at tetap)
+UPSERT_COLUMNS = ("name", "category", "description", "images", "stock", "price", "discount", "status")
+CSV_LIST_SEPARATOR = "|"
+
+
+# ==========================================
+# 📥 Parsing (streaming)
+# ==========================================
+async def iter_lines(stream):
+    """Potong body streaming menjadi baris (UTF-8), tanpa menampung seluruh body."""
+    pending = ""
+    # karakter multi-byte / CRLF bisa terpotong di batas chunk
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8-sig")(errors="replace"), translate=True)
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def ndjson_records(lines):
+    """Yield (nomor baris, dict | pesan error)."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, f"invalid JSON: {e}"
+            continue
+        yield number, record if isinstance(record, dict) else "expected a JSON object"
+
+
+async def csv_records(lines):
+    """
+    Yield (nomor baris, dict | pesan error). Header wajib di baris pertama;
+    field ber-quote yang memuat newline digabung dulu sebelum di-parse.
+    `images` dipisah dengan '|'; sel kosong = tidak diisi.
+    """
+    header, buffer, start, number = None, [], 0, 0
+    async for line in lines:
+        number += 1
+        if not buffer:
+            start = number
+        buffer.append(line)
+        if sum(part.count('"') for part in buffer) % 2:
+            continue  # masih di dalam field ber-quote
+        row = next(csv.reader(["\n".join(buffer)]), [])
+        buffer = []
+        if not any(cell.strip() for cell in row):
+            continue
+        if header is None:
+            header = [cell.strip() for cell in row]
+            continue
+        if len(row) != len(header):
+            yield start, f"expected {len(header)} columns, got {len(row)}"
+            continue
+        record = {key: value for key, value in zip(header, row) if value != ""}
+        if "images" in record:
+            record["images"] = [url for url in record["images"].split(CSV_LIST_SEPARATOR) if url]
+        yield start, record
+    if buffer:
+        yield start, "unterminated quoted field"
+
+
+# ==========================================
+# 💾 Upsert per batch
+# ==========================================
+class ImportReport:
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.processed = self.inserted = self.updated = self.skipped = self.failed = 0
+        self.errors: list[dict] = []
+        self.errors_truncated = False
+
+    def error(self, line: int, sku, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "sku": sku, "errors": message})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def validate_record(record: dict) -> ProductCreate:
+    product = ProductCreate.model_validate(record)
+    if not product.sku:
+        raise ValueError("sku is required for import")
+    return product
+
+
+def _upsert_statement(rows: list[dict], on_conflict: str):
+    """Semua `rows` punya kolom yang sama (lihat upsert_batch); hanya kolom itu yang ditimpa."""
+    statement = insert(Product).values(rows)
+    if on_conflict == "update":
+        statement = statement.on_conflict_do_update(
+            index_elements=[Product.sku],
+            set_={
+                **{column: statement.excluded[column] for column in UPSERT_COLUMNS if column in rows[0]},
+                "updated_at": func.now(),  # ETag/cache produk ikut berubah
+            },
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[Product.sku])
+    # xmax = 0 → baris baru; selain itu baris lama yang di-update
+    return statement.returning(Product.sku, literal_column("xmax = 0").label("inserted"))
+
+
+async def _upsert_rows(db, rows: list[tuple[int, str, dict]], on_conflict: str, report: ImportReport) -> tuple[list, int]:
+    """
+    INSERT di dalam savepoint; return (baris RETURNING, jumlah baris yang diterima).
+    Ditolak database → dibelah dua dan diulang, sampai hanya baris penyebabnya
+    yang dilaporkan error.
+    """
+    try:
+        async with db.begin_nested():
+            return (await db.execute(_upsert_statement([row for _, _, row in rows], on_conflict))).all(), len(rows)
+    except DBAPIError as e:
+        if len(rows) == 1:
+            line, sku, _ = rows[0]
+            message = str(e.orig).splitlines()[0] if e.orig else str(e)
+            report.error(line, sku, f"rejected by database: {message}")
+            return [], 0
+    middle = len(rows) // 2
+    first, first_ok = await _upsert_rows(db, rows[:middle], on_conflict, report)
+    second, second_ok = await _upsert_rows(db, rows[middle:], on_conflict, report)
+    return first + second, first_ok + second_ok
+
+
+async def upsert_batch(db, batch: list[tuple[int, ProductCreate]], created_by_id, on_conflict: str, report: ImportReport):
+    """
+    INSERT multi-row per batch, dikelompokkan per set kolom yang diisi (dipecah
+    per batas bind parameter); SKU ganda dalam batch → baris terakhir yang dipakai.
+    """
+    latest: dict[str, tuple[int, ProductCreate]] = {}
+    for line, product in batch:
+        if product.sku in latest:
+            report.error(latest[product.sku][0], product.sku, f"superseded by line {line} (duplicate sku in batch)")
+        latest[product.sku] = (line, product)
+
+    # kolom yang tidak diisi tidak ikut ditulis: baris baru dapat default kolom, baris lama tidak berubah
+    groups: dict[tuple[str, ...], list[tuple[int, str, dict]]] = {}
+    for line, product in latest.values():
+        fields = {**product.model_dump(exclude_unset=True), "created_by_id": created_by_id}
+        groups.setdefault(tuple(sorted(fields)), []).append((line, product.sku, fields))
+    if not groups:
+        return
+
+    result, accepted = [], 0
+    for names, rows in groups.items():
+        chunk_size = max(1, MAX_BIND_PARAMS // len(names))
+        for start in range(0, len(rows), chunk_size):
+            chunk_result, chunk_accepted = await _upsert_rows(db, rows[start:start + chunk_size], on_conflict, report)
+            result += chunk_result
+            accepted += chunk_accepted
+    await db.commit()
+
+    inserted = sum(1 for row in result if row.inserted)
+    report.inserted += inserted
+    report.updated += len(result) - inserted
+    report.skipped += accepted - len(result)
+
+
+async def import_products(db, records, created_by_id, on_conflict: str, batch_size: int, max_errors: int) -> dict:
+    report = ImportReport(max_errors)
+    batch: list[tuple[int, ProductCreate]] = []
+
+    async for line, record in records:
+        report.processed += 1
+        if isinstance(record, str):
+            report.error(line, None, record)
+            continue
+        try:
+            batch.append((line, validate_record(record)))
+        except ValidationError as e:
+            report.error(line, record.get("sku"), [
+                {"field": ".".join(map(str, err["loc"])), "message": err["msg"]} for err in e.errors()
+            ])
+        except ValueError as e:
+            report.error(line, record.get("sku"), str(e))
+
+        if len(batch) >= batch_size:
+            await upsert_batch(db, batch, created_by_id, on_conflict, report)
+            batch = []
+
+    if batch:
+        await upsert_batch(db, batch, created_by_id, on_conflict, report)
+    return report.as_dict()
+
+
+# ==========================================
+# 📤 Export (server-side cursor)
+# ==========================================
+def _export_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool, list)):
+        return value
+    return str(value)
+
+
+async def export_rows(batch_size: int):
+    """Yield list baris (dict) per batch dari server-side cursor."""
+    columns = [getattr(Product, name) for name in EXPORT_COLUMNS]
+    statement = (
+        select(*columns)
+        .order_by(Product.created_at, Product.id)
+        .execution_options(yield_per=batch_size)
+    )
+    # session sendiri: dependency get_db sudah ditutup sebelum body StreamingResponse dikirim
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement)
+        async for partition in result.partitions():
+            yield [{name: _export_value(value) for name, value in zip(EXPORT_COLUMNS, row)} for row in partition]
+
+
+async def export_ndjson(batch_size: int):
+    async for rows in export_rows(batch_size):
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+async def export_csv(batch_size: int):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for rows in export_rows(batch_size):
+        for row in rows:
+            row["images"] = CSV_LIST_SEPARATOR.join(row["images"] or [])
+            writer.writerow([row[name] for name in EXPORT_COLUMNS])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
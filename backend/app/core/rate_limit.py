@@ -0,0 +1,201 @@
+"""
+Rate limiting (GCRA, setara token bucket) untuk endpoint mahal.
+
+Setiap key (IP, user id, email) hanya menyimpan satu angka: TAT (theoretical
+arrival time). Limit "5/minute" mengizinkan burst 5 request, lalu 1 request
+per 12 detik; request yang ditolak tidak menggeser TAT. Jadi memori per key
+konstan dan tidak ada daftar timestamp per request.
+
+Store:
+- default / `memory://`: LRU in-process (maks. RATE_LIMIT_MAX_KEYS key), per worker; tanpa
+  TTL — key lama hanya digusur LRU (TAT yang sudah lewat setara dengan key baru);
+- `redis://...`: dibagi antar worker/instance, cek + update atomik lewat script Lua
+  (klien `redis.asyncio`, jadi event loop tidak ikut menunggu jaringan).
+Store bersama yang error → request diizinkan (fail open) dan dicatat di log.
+
+Ditolak → 429 dengan header Retry-After (detik, dibulatkan ke atas).
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.jwt import verify_access_token
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        """Jarak antar request saat bucket sudah habis."""
+        return self.period / self.limit
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """`"5/minute"`, `"100/hour"`, `"10/30second"` → Rate."""
+        count, _, unit = value.strip().partition("/")
+        multiplier = "".join(ch for ch in unit if ch.isdigit()) or "1"
+        unit = unit.lstrip("0123456789").strip().lower().rstrip("s")
+        if unit not in PERIODS or not count.strip().isdigit() or int(count) <= 0:
+            raise ValueError(f"Invalid rate limit: {value!r} (expected e.g. '5/minute')")
+        return cls(limit=int(count), period=PERIODS[unit] * int(multiplier))
+
+
+def gcra(tat: float | None, now: float, rate: Rate) -> tuple[bool, float, float]:
+    """Satu langkah GCRA → (diizinkan, TAT baru, retry_after detik)."""
+    tat = max(tat or now, now)
+    new_tat = tat + rate.interval
+    allow_at = new_tat - rate.period
+    if allow_at > now:
+        return False, tat, allow_at - now
+    return True, new_tat, 0.0
+
+
+# ==========================================
+# 🗃️ Store
+# ==========================================
+class RateLimitStore:
+    """Interface store rate limit: satu operasi atomik per request."""
+
+    async def hit(self, key: str, rate: Rate) -> tuple[bool, float]:
+        """Return (diizinkan, retry_after detik)."""
+        raise NotImplementedError
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """LRU key → TAT. Entry yang bucket-nya sudah penuh kembali sama dengan key baru, jadi aman dibuang."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._tats: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key, rate):
+        # tanpa await di antara baca & tulis: atomik terhadap task lain di event loop
+        now = time.monotonic()
+        with self._lock:
+            allowed, tat, retry_after = gcra(self._tats.get(key), now, rate)
+            if allowed:
+                self._tats[key] = tat
+                self._tats.move_to_end(key)
+                while len(self._tats) > self.max_keys:
+                    self._tats.popitem(last=False)
+        return allowed, retry_after
+
+    def __len__(self):
+        return len(self._tats)
+
+
+_REDIS_GCRA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+  return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Store bersama via Redis (butuh package `redis`, tidak wajib terpasang)."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RedisRateLimitStore requires the 'redis' package (pip install redis)")
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_GCRA)
+
+    async def hit(self, key, rate):
+        # jam dinding: TAT dibandingkan antar host
+        allowed, retry_after = await self._script(keys=[key], args=[time.time(), rate.interval, rate.period])
+        return bool(int(allowed)), float(retry_after)
+
+
+def store_from_url(url: str | None, max_keys: int = 100000) -> RateLimitStore:
+    """kosong / `memory://` → in-process, `redis://...` → Redis."""
+    if not url or url.startswith("memory://"):
+        return InMemoryRateLimitStore(max_keys=max_keys)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitStore(url)
+    raise ValueError(f"Unsupported rate limit store URL: {url}")
+
+
+store = store_from_url(settings.RATE_LIMIT_STORE_URL, settings.RATE_LIMIT_MAX_KEYS)
+
+# Jumlah request yang ditolak per policy (diekspor ke /metrics)
+rejections: dict[str, int] = {}
+
+
+# ==========================================
+# 🚦 Policy
+# ==========================================
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """Satu policy bernama dengan satu rate; `check(key)` raise 429 bila habis."""
+
+    def __init__(self, name: str, rate: str):
+        self.name = name
+        self.rate = Rate.parse(rate)
+
+    async def check(self, key: str):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        try:
+            allowed, retry_after = await store.hit(f"ratelimit:{self.name}:{key}", self.rate)
+        except Exception:
+            logger.exception(f"💥 Rate limit store failed ({self.name}), allowing request")
+            return
+        if not allowed:
+            rejections[self.name] = rejections.get(self.name, 0) + 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    async def by_ip(self, request: Request):
+        """Dependency: key = IP client."""
+        await self.check(f"ip:{client_ip(request)}")
+
+    async def by_user_or_ip(self, request: Request):
+        """Dependency: key = user id bila bearer token valid, selain itu IP client."""
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        payload = verify_access_token(token) if scheme.lower() == "bearer" and token else None
+        if payload and payload.get("sub"):
+            await self.check(f"user:{payload['sub']}")
+        else:
+            await self.check(f"ip:{client_ip(request)}")
+
+
+login_ip_limit = RateLimiter("login_ip", settings.RATE_LIMIT_LOGIN_IP)
+login_email_limit = RateLimiter("login_email", settings.RATE_LIMIT_LOGIN_EMAIL)
+register_ip_limit = RateLimiter("register_ip", settings.RATE_LIMIT_REGISTER_IP)
+search_limit = RateLimiter("search", settings.RATE_LIMIT_SEARCH)
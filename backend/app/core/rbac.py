@@ -1,10 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from app.core.dependencies import get_current_user
-from app.models.user import User
+from app.core.principal import AuthPrincipal
 
 def require_role(required_role: str):
-    def role_dependency(current_user: User = Depends(get_current_user)):
-        if not current_user.role or current_user.role.name != required_role:
+    async def role_dependency(current_user: AuthPrincipal = Depends(get_current_user)):
+        # role sudah ada di principal, tidak perlu query roles lagi
+        if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions"
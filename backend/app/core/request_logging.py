@@ -0,0 +1,201 @@
+"""
+Logging aplikasi dan request dengan overhead rendah.
+
+- Semua handler (file rotasi + console) berjalan di thread QueueListener; di event
+  loop `logging.*` hanya merender pesan (%-args) lalu memasukkan LogRecord ke
+  antrean; traceback dan baris JSON/console di-format di thread itu (lihat
+  `_DeferredQueueHandler.prepare`).
+- `RequestLoggingMiddleware` adalah pure ASGI: body request tidak pernah dibaca,
+  hanya status, ukuran response dan latency yang dicatat, dengan template route
+  (`/products/{product_id}`) supaya mudah di-agregasi.
+- Request sukses bisa di-sample (LOG_REQUEST_SAMPLE_RATE); error dan request
+  lambat selalu di-log.
+
+Access log uvicorn mencatat hal yang sama; jalankan dengan `--no-access-log`
+supaya tidak dobel.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+
+from starlette.datastructures import Headers, MutableHeaders
+
+request_logger = logging.getLogger("app.request")
+
+# Atribut bawaan LogRecord; sisanya (dari `extra=`) ikut ditulis ke JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record: ts, level, logger, msg + field dari `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler non-blocking: antrean penuh → record dibuang (dihitung), bukan menunggu."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # %-args dirender sekarang (nilainya bisa berubah setelah pemanggilan log);
+        # baris akhir (JSON/console) dan traceback tetap di-format di thread listener.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: QueueListener | None = None
+_queue_handler: _DeferredQueueHandler | None = None
+
+
+def setup_logging(env: str, log_dir: str = "logs", queue_size: int = 10000):
+    """Pasang QueueHandler di root logger; file (JSON, rotasi harian) + console di thread listener."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = TimedRotatingFileHandler(
+        os.path.join(log_dir, "app.log"),
+        when="midnight",
+        interval=1,
+        backupCount=7,
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        if env == "development" else JsonFormatter()
+    )
+
+    _queue_handler = _DeferredQueueHandler(queue.Queue(maxsize=queue_size))
+    _listener = QueueListener(_queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(logging.INFO if env == "development" else logging.WARNING)
+    # log request tetap INFO walau root WARNING di production
+    request_logger.setLevel(logging.INFO)
+
+
+def stop_logging():
+    """Kosongkan antrean ke handler lalu hentikan thread listener (dipanggil saat shutdown)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    handler = _queue_handler
+    return {
+        "queue_depth": handler.queue.qsize() if handler else 0,
+        "dropped_total": handler.dropped if handler else 0,
+    }
+
+
+def route_template(scope) -> str | None:
+    """Template path route yang cocok (FastAPI mengisi scope["route"]); None bila tidak ada."""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None)
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI: satu record terstruktur per request, tanpa menyentuh body."""
+
+    def __init__(self, app, sample_rate: float = 1.0, slow_ms: float = 1000.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        status_code = 500
+        response_bytes = 0
+        started = time.perf_counter()
+        finished = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes, finished
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            # latency = sampai body terakhir terkirim; BackgroundTasks sesudahnya tidak dihitung
+            duration_ms = ((finished or time.perf_counter()) - started) * 1000
+            self._log(scope, request_id, status_code, response_bytes, duration_ms, error)
+
+    def _log(self, scope, request_id, status_code, response_bytes, duration_ms, error):
+        slow = duration_ms >= self.slow_ms
+        if error is None and status_code < 400 and not slow and random.random() >= self.sample_rate:
+            return
+
+        level = logging.ERROR if error is not None or status_code >= 500 else (
+            logging.WARNING if status_code >= 400 or slow else logging.INFO
+        )
+        if not request_logger.isEnabledFor(level):
+            return
+
+        route = route_template(scope)
+        client = scope.get("client")
+        # pesan %-args hanya dirender bila level ini lolos (isEnabledFor di atas)
+        request_logger.log(
+            level,
+            "%s %s %s %.1fms",
+            scope["method"], route or scope["path"], status_code, duration_ms,
+            exc_info=(type(error), error, error.__traceback__) if error is not None else None,
+            extra={
+                "request_id": request_id,
+                "method": scope["method"],
+                "route": route,
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration_ms, 2),
+                "response_bytes": response_bytes,
+                "client_ip": client[0] if client else None,
+                "sampled": self.sample_rate if error is None and status_code < 400 and not slow else 1.0,
+            },
+        )
@@ -0,0 +1,26 @@
+"""
+Response JSON yang sudah di-serialize.
+
+Route panas (list/detail produk) men-serialize envelope bertipe sekali lewat
+`model_dump_json` (pydantic-core, Rust) lalu mengembalikan bytes-nya apa adanya:
+FastAPI tidak lagi memvalidasi ulang `response_model` dan tidak lewat
+jsonable_encoder + json.dumps. `response_model` tetap dipasang untuk OpenAPI.
+"""
+from fastapi.responses import Response
+
+# Harus identik dengan SuccessResponse(data=...).model_dump_json()
+_ENVELOPE_PREFIX = b'{"success":true,"data":'
+_ENVELOPE_SUFFIX = b"}"
+
+
+class RawJSONResponse(Response):
+    """Body sudah berupa JSON (bytes/str); tidak di-render ulang."""
+
+    media_type = "application/json"
+
+
+def success_json(data_json: str | bytes, headers: dict | None = None) -> RawJSONResponse:
+    """Bungkus JSON `data` yang sudah jadi (mis. dari cache) dengan envelope sukses."""
+    if isinstance(data_json, str):
+        data_json = data_json.encode("utf-8")
+    return RawJSONResponse(_ENVELOPE_PREFIX + data_json + _ENVELOPE_SUFFIX, headers=headers)
@@ -1,6 +1,21 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+# min_rounds = default_rounds: hash dengan cost lebih rendah dianggap usang (needs_update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def get_password_hash(password: str) -> str:
     # bcrypt supports only up to 72 bytes; truncate to prevent error
@@ -10,3 +25,85 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     plain_password = plain_password[:72]
     return pwd_context.verify(plain_password, hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+# ==========================================
+# 🧵 Executor khusus bcrypt
+# ==========================================
+# bcrypt melepas GIL, jadi thread pool cukup; executor terpisah supaya burst login
+# tidak menghabiskan threadpool default yang dipakai route/dependency sync lain.
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.in_flight = 0  # sedang diproses + menunggu di antrean executor
+        self.completed = 0
+        self.rejected = 0
+        self.duration = Histogram(buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+        self.queue_wait = Histogram()
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service busy, retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self.in_flight += 1
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            self.queue_wait.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self.duration.observe(time.perf_counter() - started)
+
+        try:
+            future = self._executor.submit(timed)
+        except BaseException:
+            self._release(None)
+            raise
+        # slot dilepas saat job benar-benar selesai (atau batal sebelum jalan), bukan saat
+        # coroutine pemanggil di-cancel: job yang masih antre/jalan tetap terhitung
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            if future is not None and not future.cancelled():
+                self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "completed_total": self.completed,
+            "rejected_total": self.rejected,
+            "rounds": settings.BCRYPT_ROUNDS,
+            "duration_seconds": self.duration.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,225 @@
+"""
+Profiler SQL per request (opt-in) dan deteksi N+1.
+
+Aktif bila SQL_PROFILER_MODE = "always", atau "header" dan request membawa
+`X-SQL-Profile: 1`. Selama request itu setiap statement dicatat dengan durasi
+dan asal pemanggilnya (frame pertama di dalam `app/` di luar modul ini).
+Statement dengan bentuk sama (literal/parameter dinormalisasi) yang muncul
+>= SQL_PROFILER_N_PLUS_ONE_THRESHOLD kali dari asal yang sama ditandai sebagai
+kandidat N+1 — pola klasik lazy load per item (`product.created_by`, `user.role`).
+
+Hasilnya:
+- header `Server-Timing: db;dur=..;desc="N queries"` (+ `X-SQL-Profile-N-Plus-One`);
+- satu record log `app.sql_profiler` per request dan ring buffer laporan terakhir
+  (GET /admin/sql-profiles);
+- di development, SELECT yang lebih lambat dari SQL_PROFILER_EXPLAIN_MS di-EXPLAIN
+  ANALYZE setelah response terkirim (transaksi read-only, lalu rollback).
+"""
+import contextvars
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+
+import greenlet
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.request_logging import route_template
+
+logger = logging.getLogger("app.sql_profiler")
+logger.setLevel(logging.INFO)  # profil opt-in tetap tercatat walau root WARNING
+
+PROFILE_HEADER = "x-sql-profile"
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Frame dari modul-modul ini bukan "asal" query yang menarik
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(_APP_DIR, "core", "database.py")}
+
+_PARAM_RE = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalisasi statement: parameter & literal → ?, daftar IN (...) diringkas."""
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _LITERAL_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("IN (...)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+def _origin() -> str:
+    """file:line fungsi di dalam app/ yang memicu statement."""
+    frame, current = sys._getframe(2), greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_APP_DIR) and filename not in _SKIP_FILES:
+                return f"{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        # AsyncSession menjalankan ORM di greenlet anak: lanjut ke stack coroutine pemanggil
+        current = current.parent
+        if current is None:
+            return "<unknown>"
+        frame = current.gr_frame
+
+
+class SQLProfile:
+    def __init__(self):
+        self.statements: list[dict] = []
+        self.started = time.perf_counter()
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(s["duration"] for s in self.statements)
+
+    def n_plus_one(self, threshold: int) -> list[dict]:
+        counts = Counter((s["shape"], s["origin"]) for s in self.statements)
+        return [
+            {"count": count, "origin": origin, "shape": shape}
+            for (shape, origin), count in counts.most_common()
+            if count >= threshold
+        ]
+
+    def report(self, method: str, route: str, status: int) -> dict:
+        return {
+            "method": method,
+            "route": route,
+            "status": status,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "db_ms": round(self.db_seconds * 1000, 2),
+            "queries": len(self.statements),
+            "n_plus_one": self.n_plus_one(settings.SQL_PROFILER_N_PLUS_ONE_THRESHOLD),
+            "statements": [
+                {
+                    "sql": s["statement"][:2000],
+                    "duration_ms": round(s["duration"] * 1000, 3),
+                    "origin": s["origin"],
+                    **({"explain": s["explain"]} if "explain" in s else {}),
+                }
+                for s in self.statements
+            ],
+        }
+
+
+_current_profile: contextvars.ContextVar[SQLProfile | None] = contextvars.ContextVar("sql_profile", default=None)
+
+# Laporan terakhir (per worker) untuk GET /admin/sql-profiles
+recent_profiles: deque = deque(maxlen=50)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = conn.info.get("profile_started")
+    if profile is None or not started:
+        return
+    profile.statements.append({
+        "statement": statement,
+        "parameters": parameters,
+        "duration": time.perf_counter() - started.pop(),
+        "origin": _origin(),
+        "shape": statement_shape(statement),
+    })
+
+
+@event.listens_for(async_engine.sync_engine, "handle_error")
+def _handle_error(context):
+    started = context.connection.info.get("profile_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def profiling_requested(scope) -> bool:
+    mode = settings.SQL_PROFILER_MODE
+    if mode == "always":
+        return True
+    return mode == "header" and Headers(scope=scope).get(PROFILE_HEADER, "") in {"1", "true", "yes"}
+
+
+async def explain_slow_statements(profile: SQLProfile):
+    """EXPLAIN ANALYZE untuk SELECT lambat (development saja: ANALYZE benar-benar menjalankan query)."""
+    threshold = settings.SQL_PROFILER_EXPLAIN_MS / 1000
+    slow = [
+        s for s in profile.statements
+        if s["duration"] >= threshold and s["statement"].lstrip().upper().startswith(("SELECT", "WITH"))
+    ][: settings.SQL_PROFILER_EXPLAIN_MAX]
+    if not slow:
+        return
+    async with async_engine.connect() as conn:
+        await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+        for statement in slow:
+            try:
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (ANALYZE, BUFFERS) " + statement["statement"], statement["parameters"]
+                )
+                statement["explain"] = "\n".join(row[0] for row in result)
+            except Exception as exc:
+                statement["explain"] = f"<explain failed: {exc}>"
+                break  # transaksi sudah aborted
+        await conn.rollback()
+
+
+class SQLProfilerMiddleware:
+    """Pure ASGI: aktifkan profil untuk request ini lalu laporkan hasilnya."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling_requested(scope):
+            return await self.app(scope, receive, send)
+
+        profile = SQLProfile()
+        token = _current_profile.set(profile)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                # statement yang jalan setelah header terkirim (body stream) tidak ikut di sini
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={profile.db_seconds * 1000:.2f};desc="{len(profile.statements)} queries", '
+                    f"app;dur={(time.perf_counter() - profile.started) * 1000:.2f}",
+                )
+                suspects = profile.n_plus_one(settings.SQL_PROFILER_N_PLUS_ONE_THRESHOLD)
+                if suspects:
+                    headers["X-SQL-Profile-N-Plus-One"] = str(len(suspects))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            await self._finish(scope, profile, status_code)
+
+    async def _finish(self, scope, profile: SQLProfile, status_code: int):
+        if os.getenv("APP_ENV", "development") == "development" and settings.SQL_PROFILER_EXPLAIN_MS > 0:
+            try:
+                await explain_slow_statements(profile)
+            except Exception:
+                logger.exception("💥 EXPLAIN ANALYZE failed")
+
+        report = profile.report(scope["method"], route_template(scope) or scope["path"], status_code)
+        recent_profiles.append(report)
+        level = logging.WARNING if report["n_plus_one"] else logging.INFO
+        logger.log(
+            level,
+            "SQL profile %s %s: %d queries, %.1fms db, %d N+1 candidate(s)",
+            report["method"], report["route"], report["queries"], report["db_ms"], len(report["n_plus_one"]),
+            extra={"sql_profile": report},
+        )
@@ -0,0 +1,178 @@
+"""
+Serving file upload: header cache, 304, byte range dan varian precompressed.
+
+Nama file upload berbasis UUID dan tidak pernah ditimpa, jadi response-nya aman
+di-cache selamanya (`immutable`). ETag diambil dari inode + mtime + ukuran (satu
+`os.stat`, tanpa membaca isi file).
+"""
+import mimetypes
+import os
+import stat as stat_module
+from datetime import datetime, timezone
+from email.utils import formatdate
+
+import anyio
+from fastapi import HTTPException, Request
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.core.http_cache import parse_http_date, is_not_modified
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Dipakai saat varian yang diminta belum tersedia dan file asli dilayani sementara
+FALLBACK_CACHE_CONTROL = "public, max-age=60"
+
+# Sibling precompressed (`file.svg.br`, `file.svg.gz`) sesuai urutan preferensi
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+async def stat_file(path: str) -> os.stat_result | None:
+    """Satu os.stat di thread (menggantikan exists + stat terpisah); None jika bukan file."""
+    try:
+        result = await anyio.to_thread.run_sync(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return result if stat_module.S_ISREG(result.st_mode) else None
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Satu rentang `bytes=start-end` → (start, end) inklusif. Multi-range tidak
+    didukung (return None → file utuh, diperbolehkan RFC 9110).
+    Rentang di luar ukuran file → HTTPException 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:  # suffix range: N byte terakhir
+            length = int(end_text)
+            if length <= 0:
+                raise _unsatisfiable(size)
+            start, end = max(0, size - length), size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise _unsatisfiable(size)
+    return start, min(end, size - 1)
+
+
+def _unsatisfiable(size: int) -> HTTPException:
+    return HTTPException(status_code=416, detail="Requested range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+
+
+def _if_range_matches(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    since = parse_http_date(if_range)
+    return since is not None and int(stat_result.st_mtime) <= since.timestamp()
+
+
+class FileRangeResponse(Response):
+    """206 Partial Content: kirim potongan file per chunk tanpa memuat seluruh file."""
+
+    def __init__(self, path: str, start: int, end: int, size: int, headers: dict, media_type: str | None):
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path, self.start, self.end = path, start, end
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            while remaining > 0:
+                chunk = await f.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def _precompressed(request: Request, path: str):
+    accepted = request.headers.get("accept-encoding", "")
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in accepted:
+            stat_result = await stat_file(path + suffix)
+            if stat_result is not None:
+                return encoding, path + suffix, stat_result
+    return None
+
+
+async def file_response(
+    request: Request,
+    path: str,
+    stat_result: os.stat_result,
+    cache_control: str = IMMUTABLE_CACHE_CONTROL,
+) -> Response:
+    """FileResponse dengan Cache-Control, ETag/Last-Modified, 304, Range dan precompressed."""
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = {"Cache-Control": cache_control, "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+
+    encoded = None if "range" in request.headers else await _precompressed(request, path)
+    if encoded:
+        encoding, path, stat_result = encoded
+        headers["Content-Encoding"] = encoding
+
+    etag = file_etag(stat_result)
+    if encoded:
+        etag = f'{etag[:-1]}-{encoding}"'
+    headers["ETag"] = etag
+    headers["Last-Modified"] = formatdate(stat_result.st_mtime, usegmt=True)
+
+    last_modified = datetime.fromtimestamp(int(stat_result.st_mtime), tz=timezone.utc)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if range_header and _if_range_matches(request, etag, stat_result):
+        byte_range = parse_range(range_header, stat_result.st_size)
+        if byte_range:
+            return FileRangeResponse(path, *byte_range, stat_result.st_size, headers, media_type)
+
+    return FileResponse(path, stat_result=stat_result, headers=headers, media_type=media_type)
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Mode mount (UPLOAD_SERVE_MODE=static): direktori upload dilayani langsung oleh
+    handler static tanpa lewat route/dependency FastAPI. Query ?size=/&format=
+    tidak diproses di mode ini (file asli yang dilayani).
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        return _DeferredFileResponse(str(full_path), stat_result)
+
+
+class _DeferredFileResponse(Response):
+    # StaticFiles.file_response sinkron; response sebenarnya dibangun saat dipanggil
+    def __init__(self, path: str, stat_result: os.stat_result):
+        self.path, self.stat_result = path, stat_result
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        request = Request(scope, receive)
+        try:
+            response = await file_response(request, self.path, self.stat_result)
+        except HTTPException as exc:
+            response = Response(status_code=exc.status_code, headers=exc.headers)
+        await response(scope, receive, send)
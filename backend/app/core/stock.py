@@ -0,0 +1,191 @@
+"""
+Reservasi stok yang aman terhadap checkout bersamaan.
+
+Stok tidak pernah diubah dengan read-modify-write di Python:
+- satu produk: `UPDATE products SET stock = stock - n WHERE id = :id AND stock >= n`
+  (satu round trip, row lock dipegang Postgres sampai commit);
+- banyak produk: row dikunci dulu dengan `SELECT ... ORDER BY id FOR UPDATE`
+  (urutan lock selalu sama → tidak ada deadlock antar reservasi), baru dikurangi
+  dengan satu UPDATE ... FROM (VALUES ...).
+
+Reservasi yang tidak di-commit sebelum `expires_at` dikembalikan ke stok oleh sweeper.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.catalog import products_changed
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.product import Product
+from app.models.reservation import (
+    StockReservation, StockReservationItem,
+    RESERVATION_ACTIVE, RESERVATION_EXPIRED, RESERVATION_RELEASED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _lock_products(db, product_ids) -> dict:
+    """Kunci row produk dalam urutan id; return {id: stock} (id yang tidak ada tidak muncul)."""
+    result = await db.execute(
+        select(Product.id, Product.stock)
+        .where(Product.id.in_(product_ids))
+        .order_by(Product.id)
+        .with_for_update()
+    )
+    return {row.id: row.stock for row in result}
+
+
+async def _apply_deltas(db, deltas: dict):
+    """stock = stock + delta untuk semua produk sekaligus (row sudah dikunci pemanggil)."""
+    source = values(
+        column("id", UUID(as_uuid=True)), column("delta", Product.stock.type), name="v"
+    ).data(list(deltas.items()))
+    await db.execute(
+        update(Product)
+        .where(Product.id == source.c.id)
+        .values(stock=Product.stock + source.c.delta, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _shortage(quantities: dict, available: dict) -> HTTPException:
+    missing = [str(pid) for pid in quantities if pid not in available]
+    if missing:
+        return HTTPException(status_code=404, detail=f"Product not found: {', '.join(missing)}")
+    short = [
+        f"{pid} (requested {quantities[pid]}, available {available[pid]})"
+        for pid in sorted(quantities)
+        if available[pid] < quantities[pid]
+    ]
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Insufficient stock: {'; '.join(short)}")
+
+
+async def reserve_stock(db, user_id, quantities: dict, ttl_seconds: int | None = None) -> StockReservation:
+    """
+    Kurangi stok untuk {product_id: quantity} dan catat reservasinya.
+    Semua atau tidak sama sekali: 404/409 jika ada produk yang hilang atau stoknya kurang.
+    Pemanggil yang commit (lock dilepas saat commit).
+    """
+    product_ids = sorted(quantities)
+
+    if len(product_ids) == 1:
+        product_id = product_ids[0]
+        quantity = quantities[product_id]
+        result = await db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity, updated_at=func.now())
+            .returning(Product.id)
+            .execution_options(synchronize_session=False)
+        )
+        if result.scalar_one_or_none() is None:
+            stock = await db.scalar(select(Product.stock).where(Product.id == product_id))
+            raise _shortage(quantities, {} if stock is None else {product_id: stock})
+    else:
+        available = await _lock_products(db, product_ids)
+        if len(available) < len(product_ids) or any(available[pid] < quantities[pid] for pid in product_ids):
+            raise _shortage(quantities, available)
+        await _apply_deltas(db, {pid: -quantities[pid] for pid in product_ids})
+
+    ttl = settings.STOCK_RESERVATION_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    reservation = StockReservation(
+        user_id=user_id,
+        status=RESERVATION_ACTIVE,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl),
+        items=[StockReservationItem(product_id=pid, quantity=quantities[pid]) for pid in product_ids],
+    )
+    db.add(reservation)
+    await db.flush()
+    return reservation
+
+
+async def lock_reservation(db, reservation_id) -> StockReservation | None:
+    """Ambil reservasi dengan row lock, supaya commit/release/sweeper tidak saling balapan."""
+    result = await db.execute(
+        select(StockReservation)
+        .where(StockReservation.id == reservation_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+def is_expired(reservation: StockReservation) -> bool:
+    return reservation.expires_at <= datetime.now(timezone.utc)
+
+
+async def release_reservation(db, reservation: StockReservation, new_status: str = RESERVATION_RELEASED) -> list:
+    """Kembalikan stok reservasi aktif (row reservasi sudah dikunci). Return product id yang berubah."""
+    deltas = {item.product_id: item.quantity for item in reservation.items}
+    await _lock_products(db, sorted(deltas))
+    await _apply_deltas(db, deltas)
+    reservation.status = new_status
+    return sorted(deltas)
+
+
+async def expire_reservations(limit: int | None = None) -> dict:
+    """
+    Kembalikan stok reservasi aktif yang sudah lewat `expires_at`.
+    SKIP LOCKED: aman dijalankan dari banyak worker, reservasi yang sedang
+    di-commit/release dilewati dan diambil sweep berikutnya bila masih aktif.
+    """
+    limit = limit or settings.STOCK_RESERVATION_SWEEP_BATCH_SIZE
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(StockReservation)
+            .where(StockReservation.status == RESERVATION_ACTIVE, StockReservation.expires_at <= func.now())
+            .order_by(StockReservation.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        expired = list(result.scalars().all())
+        if not expired:
+            return {"expired": 0, "products": 0}
+
+        deltas: dict = {}
+        for reservation in expired:
+            for item in reservation.items:
+                deltas[item.product_id] = deltas.get(item.product_id, 0) + item.quantity
+            reservation.status = RESERVATION_EXPIRED
+
+        await _lock_products(db, sorted(deltas))
+        await _apply_deltas(db, deltas)
+        await db.commit()
+
+    for product_id in deltas:
+        await products_changed(product_id)
+    logger.info(f"⏳ Released {len(expired)} expired stock reservation(s)")
+    return {"expired": len(expired), "products": len(deltas)}
+
+
+_sweep_task: asyncio.Task | None = None
+
+
+async def _sweep_loop():
+    while True:
+        await asyncio.sleep(settings.STOCK_RESERVATION_SWEEP_INTERVAL_SECONDS)
+        try:
+            # habiskan backlog sebelum tidur lagi
+            while (await expire_reservations())["expired"] >= settings.STOCK_RESERVATION_SWEEP_BATCH_SIZE:
+                pass
+        except Exception:
+            logger.exception("💥 Stock reservation sweep failed")
+
+
+async def start_reservation_sweeper():
+    global _sweep_task
+    if settings.STOCK_RESERVATION_SWEEP_INTERVAL_SECONDS > 0 and _sweep_task is None:
+        _sweep_task = asyncio.create_task(_sweep_loop())
+
+
+async def stop_reservation_sweeper():
+    global _sweep_task
+    if _sweep_task is not None:
+        _sweep_task.cancel()
+        _sweep_task = None
@@ -0,0 +1,391 @@
+"""
+Penyimpanan blob upload berbasis hash konten (content-addressed).
+
+Nama blob = sha256 isi file + ekstensi, jadi foto yang sama untuk banyak produk
+hanya tersimpan sekali. Blob tidak dihapus saat produk/gambar dihapus: jumlah
+referensi dihitung dari Product.images dan sweep GC di background menghapus
+blob (beserta turunannya) yang sudah tidak direferensikan.
+
+Backend dipilih lewat STORAGE_URL:
+    (kosong)                 → filesystem lokal (UPLOAD_DIR)
+    s3://bucket/prefix       → S3 / S3-compatible (butuh `pip install boto3`)
+    s3local://bucket/prefix  → API S3 yang sama, disimpan di STORAGE_S3_LOCAL_ROOT (dev/test)
+"""
+import asyncio
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable
+from urllib.parse import urlparse
+
+from sqlalchemy import any_, bindparam, func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.path.join(os.getcwd(), "app", "storage", "uploads")
+UPLOAD_URL_PREFIX = "/upload/"
+
+# File sementara: `.<uuid>.part` saat upload di-stream (app/core/uploads.py) dan
+# `<blob key>.part` saat turunan/manifest ditulis (app/core/images.py)
+TEMP_SUFFIX = ".part"
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".bmp", ".svg", ".tif", ".tiff", ".heic"}
+
+# Hanya file hasil kode upload yang disentuh GC: stem sha256 (atau uuid, upload lama),
+# lalu ekstensi gambar, turunan `.<size>.<ext>` / `.manifest.json`, dan sibling .br/.gz
+_BLOB_KEY_RE = re.compile(
+    r"^(?:[0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})"
+    r"(?:\.[a-z]+\.[a-z0-9]{1,5}|\.manifest\.json|" + "|".join(re.escape(ext) for ext in sorted(IMAGE_EXTENSIONS)) + r")?"
+    r"(?:\.br|\.gz)?$"
+)
+_TEMP_KEY_RE = re.compile(r"^\.[0-9a-f-]{36}" + re.escape(TEMP_SUFFIX) + "$")
+
+
+def blob_key(digest: str, filename: str | None) -> str:
+    """Key blob dari hash konten; ekstensi asli dipertahankan bila ekstensi gambar yang dikenal."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    return digest + (ext if ext in IMAGE_EXTENSIONS else "")
+
+
+def is_blob_key(key: str) -> bool:
+    return _BLOB_KEY_RE.match(key) is not None
+
+
+def is_temp_key(key: str) -> bool:
+    if _TEMP_KEY_RE.match(key) is not None:
+        return True
+    return key.endswith(TEMP_SUFFIX) and is_blob_key(key[:-len(TEMP_SUFFIX)])
+
+
+def blob_stem(key: str) -> str:
+    """Stem bersama file asli dan turunannya (`<hash>.png`, `<hash>.thumb.webp`, ...)."""
+    return key.split(".", 1)[0]
+
+
+# ==========================================
+# 📦 Backend
+# ==========================================
+class BlobStore:
+    """Interface backend blob. Method sinkron; route memanggilnya lewat threadpool."""
+
+    is_local = False
+    staging_dir: str  # file sementara saat upload di-stream
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put(self, key: str, temp_path: str):
+        """Publikasikan file sementara yang sudah lengkap sebagai blob `key`."""
+        raise NotImplementedError
+
+    def touch(self, key: str):
+        """Perbarui waktu modifikasi (blob yang baru dipakai ulang tidak disapu GC)."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def list(self):
+        """Yield (key, mtime epoch) untuk semua blob."""
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        return UPLOAD_URL_PREFIX + key
+
+
+class LocalBlobStore(BlobStore):
+    is_local = True
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.staging_dir = directory  # filesystem sama → os.replace atomik
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def put(self, key: str, temp_path: str):
+        os.replace(temp_path, self.path(key))
+
+    def touch(self, key: str):
+        os.utime(self.path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self):
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.name, entry.stat().st_mtime
+
+
+class S3BlobStore(BlobStore):
+    """Blob di bucket S3-compatible; `client` = boto3 S3 client atau LocalS3Client."""
+
+    def __init__(self, client, bucket: str, prefix: str = "", public_url: str | None = None):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.public_url = (public_url or "").rstrip("/")
+        self.staging_dir = tempfile.gettempdir()
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def exists(self, key: str) -> bool:
+        page = self.client.list_objects_v2(Bucket=self.bucket, Prefix=self._key(key), MaxKeys=1)
+        return any(obj["Key"] == self._key(key) for obj in page.get("Contents", []))
+
+    def put(self, key: str, temp_path: str):
+        try:
+            self.client.upload_file(temp_path, self.bucket, self._key(key))
+        finally:
+            os.remove(temp_path)
+
+    def touch(self, key: str):
+        source = {"Bucket": self.bucket, "Key": self._key(key)}
+        self.client.copy_object(Bucket=self.bucket, Key=self._key(key), CopySource=source, MetadataDirective="REPLACE")
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list(self):
+        token = None
+        while True:
+            params = {"Bucket": self.bucket, "Prefix": self.prefix}
+            if token:
+                params["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**params)
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix):], obj["LastModified"].timestamp()
+            if not page.get("IsTruncated"):
+                return
+            token = page["NextContinuationToken"]
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{self._key(key)}"
+
+
+class LocalS3Client:
+    """
+    Stand-in lokal untuk subset API klien S3 (boto3) yang dipakai S3BlobStore,
+    supaya jalur S3 bisa dijalankan di dev/test tanpa bucket sungguhan.
+    """
+
+    PAGE_SIZE = 1000
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path + ".part")
+        os.replace(path + ".part", path)
+
+    def copy_object(self, Bucket: str, Key: str, CopySource: dict, **kwargs):
+        source = self._path(CopySource["Bucket"], CopySource["Key"])
+        target = self._path(Bucket, Key)
+        if source == target:
+            os.utime(target)
+        else:
+            shutil.copyfile(source, target)
+
+    def delete_object(self, Bucket: str, Key: str):
+        try:
+            os.remove(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", MaxKeys: int = PAGE_SIZE, ContinuationToken: str | None = None):
+        base = os.path.join(self.root, Bucket)
+        keys = []
+        for directory, _, files in os.walk(base):
+            for name in files:
+                key = os.path.relpath(os.path.join(directory, name), base).replace(os.sep, "/")
+                if key.startswith(Prefix) and not key.endswith(".part"):
+                    keys.append(key)
+        keys.sort()
+        start = keys.index(ContinuationToken) if ContinuationToken in keys else 0
+        page = keys[start:start + MaxKeys]
+        contents = [
+            {
+                "Key": key,
+                "Size": os.path.getsize(self._path(Bucket, key)),
+                "LastModified": datetime.fromtimestamp(os.path.getmtime(self._path(Bucket, key)), tz=timezone.utc),
+            }
+            for key in page
+        ]
+        truncated = start + MaxKeys < len(keys)
+        result = {"Contents": contents, "KeyCount": len(contents), "IsTruncated": truncated}
+        if truncated:
+            result["NextContinuationToken"] = keys[start + MaxKeys]
+        return result
+
+
+def storage_from_url(url: str | None) -> BlobStore:
+    if not url:
+        return LocalBlobStore(UPLOAD_DIR)
+
+    parsed = urlparse(url)
+    bucket, prefix = parsed.netloc, parsed.path
+    if parsed.scheme == "s3":
+        import boto3  # dependency opsional, hanya untuk backend S3
+
+        client = boto3.client("s3", endpoint_url=settings.STORAGE_S3_ENDPOINT_URL)
+        return S3BlobStore(client, bucket, prefix, settings.STORAGE_PUBLIC_URL)
+    if parsed.scheme == "s3local":
+        return S3BlobStore(LocalS3Client(settings.STORAGE_S3_LOCAL_ROOT), bucket, prefix, settings.STORAGE_PUBLIC_URL)
+    raise ValueError(f"Unsupported STORAGE_URL scheme: {parsed.scheme}")
+
+
+storage = storage_from_url(settings.STORAGE_URL)
+
+
+# ==========================================
+# 🧹 Reference count & garbage collection
+# ==========================================
+# Key advisory lock Postgres: hanya satu worker yang menyapu pada satu waktu
+GC_LOCK_ID = 0x5F0BA6E
+# URL per query refcount (dikirim sebagai satu parameter ARRAY, bukan satu bind per URL)
+REFCOUNT_CHUNK_SIZE = 5000
+
+_delete_listeners: list[Callable[[set[str]], None]] = []
+
+
+def on_blobs_deleted(callback: Callable[[set[str]], None]):
+    """Daftarkan callback; dipanggil dengan stem blob yang baru dihapus GC (mis. untuk membuang cache)."""
+    _delete_listeners.append(callback)
+    return callback
+
+
+def image_stems(urls) -> set[str]:
+    """Stem blob dari URL gambar produk (URL eksternal diabaikan)."""
+    return {blob_stem(url[len(UPLOAD_URL_PREFIX):]) for url in urls if url.startswith(UPLOAD_URL_PREFIX)}
+
+
+def _upload_urls(keys) -> list[str]:
+    return [UPLOAD_URL_PREFIX + key for key in keys]
+
+
+async def image_refcounts(db, urls: list[str]) -> dict[str, int]:
+    """Jumlah produk yang mereferensikan tiap URL gambar (pakai GIN index images)."""
+    counts = dict.fromkeys(urls, 0)
+    for start in range(0, len(urls), REFCOUNT_CHUNK_SIZE):
+        chunk = bindparam("urls", urls[start:start + REFCOUNT_CHUNK_SIZE], type_=Product.images.type)
+        images = (
+            select(func.unnest(Product.images).label("image"))
+            .where(Product.images.op("&&")(chunk))
+            .subquery()
+        )
+        rows = await db.execute(
+            select(images.c.image, func.count()).where(images.c.image == any_(chunk)).group_by(images.c.image)
+        )
+        counts.update({url: count for url, count in rows.all()})
+    return counts
+
+
+async def _referenced_stems(db, candidate_keys: list[str]) -> set[str]:
+    counts = await image_refcounts(db, _upload_urls(candidate_keys))
+    return {blob_stem(url[len(UPLOAD_URL_PREFIX):]) for url, count in counts.items() if count}
+
+
+async def collect_garbage(stems: set[str] | None = None, grace_seconds: float | None = None) -> dict:
+    """
+    Hapus blob yang tidak direferensikan produk mana pun, beserta turunannya.
+    Blob yang disentuh dalam `grace_seconds` terakhir (baru di-upload, belum
+    di-attach) dilewati. `stems` membatasi sweep ke blob tertentu.
+    """
+    grace = settings.STORAGE_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = time.time() - grace
+
+    async with AsyncSessionLocal() as db:
+        locked = (await db.execute(select(func.pg_try_advisory_xact_lock(GC_LOCK_ID)))).scalar()
+        if not locked:
+            return {"skipped": "another sweep is running"}
+
+        groups: dict[str, list[tuple[str, float]]] = defaultdict(list)
+        stale_temp = []
+        for key, mtime in await run_in_threadpool(lambda: list(storage.list())):
+            if is_temp_key(key):
+                if mtime < cutoff:
+                    stale_temp.append(key)  # sisa upload / turunan yang gagal di tengah jalan
+            elif is_blob_key(key) and (stems is None or blob_stem(key) in stems):
+                groups[blob_stem(key)].append((key, mtime))
+            # selain itu (README, dotfile, file lain) bukan milik upload: tidak disentuh
+
+        # hanya file asli (`<stem>.<ext>`) yang pernah masuk Product.images
+        candidates = [
+            key
+            for stem, files in groups.items()
+            if max(mtime for _, mtime in files) < cutoff
+            for key, _ in files
+            if key.count(".") <= 1
+        ]
+        referenced = await _referenced_stems(db, candidates)
+
+        doomed = [key for key in candidates if blob_stem(key) not in referenced]
+        deleted = stale_temp + [key for stem in {blob_stem(k) for k in doomed} for key, _ in groups[stem]]
+
+        def _delete_all():
+            for key in deleted:
+                storage.delete(key)
+
+        await run_in_threadpool(_delete_all)
+        await db.commit()  # lepas advisory lock
+    if doomed:
+        deleted_stems = {blob_stem(key) for key in doomed}
+        for callback in _delete_listeners:
+            try:
+                callback(deleted_stems)
+            except Exception:
+                logger.exception("Blob deletion callback failed")
+    if deleted:
+        logger.info(f"🧹 Storage GC removed {len(deleted)} file(s)")
+    return {"scanned_groups": len(groups), "unreferenced_blobs": len(doomed), "deleted_files": len(deleted)}
+
+
+_gc_task: asyncio.Task | None = None
+
+
+async def _gc_loop():
+    while True:
+        await asyncio.sleep(settings.STORAGE_GC_INTERVAL_SECONDS)
+        try:
+            await collect_garbage()
+        except Exception:
+            logger.exception("💥 Storage GC sweep failed")
+
+
+async def start_storage_gc():
+    global _gc_task
+    if settings.STORAGE_GC_INTERVAL_SECONDS > 0 and _gc_task is None:
+        _gc_task = asyncio.create_task(_gc_loop())
+
+
+async def stop_storage_gc():
+    global _gc_task
+    if _gc_task is not None:
+        _gc_task.cancel()
+        _gc_task = None
+
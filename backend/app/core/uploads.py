@@ -0,0 +1,235 @@
+"""
+Penyimpanan upload: body multipart di-stream langsung ke file sementara, lalu dipublikasikan.
+
+Body request dibaca sendiri dari `request.stream()` (bukan `File(...)`/`request.form()`,
+yang men-spool seluruh body ke SpooledTemporaryFile dulu): tiap bagian file ditulis
+ke staging_dir sambil dihitung sha256 dan ukurannya, dan request dihentikan (413)
+begitu satu file melewati UPLOAD_MAX_FILE_BYTES atau bagiannya bukan gambar —
+sisa body tidak pernah dibaca. Hash menjadi nama blob (lihat app/core/storage.py):
+isi yang sudah pernah di-upload tidak disimpan dua kali. Blob baru muncul hanya
+setelah semua file lengkap; upload yang gagal tidak meninggalkan file parsial.
+"""
+import hashlib
+import os
+from uuid import uuid4
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.storage import TEMP_SUFFIX, blob_key, storage
+from app.schemas.response import ErrorResponse
+
+# Body dibaca langsung dari stream, jadi skema multipart-nya dideklarasikan manual untuk OpenAPI
+IMAGE_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                }
+            }
+        },
+    }
+}
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail, headers={"Connection": "close"})
+
+
+class _StagingFile:
+    """
+    File sementara di staging_dir; sha256 + ukuran dihitung saat ditulis, berhenti begitu melewati max_bytes.
+    Dibuat dari callback parser (di event loop), jadi file baru dibuka saat write/seek pertama,
+    yang dipanggil UploadFile lewat threadpool (file ini tidak "in memory").
+    """
+
+    def __init__(self, filename: str, max_bytes: int):
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.path = os.path.join(storage.staging_dir, f".{uuid4()}{TEMP_SUFFIX}")
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self._file = None
+
+    def _opened(self):
+        if self._file is None:
+            self._file = open(self.path, "wb")
+        return self._file
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise _too_large(f"{self.filename} exceeds {self.max_bytes} bytes")
+        self.digest.update(data)
+        self._opened().write(data)
+
+    def seek(self, offset: int, whence: int = 0):
+        # selalu dipanggil di akhir bagian: file kosong (0 byte) tetap terbuat
+        return self._opened().seek(offset, whence)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class _StagingMultiPartParser(MultiPartParser):
+    """MultiPartParser Starlette, tapi bagian file ditulis ke _StagingFile, bukan SpooledTemporaryFile."""
+
+    def __init__(self, headers: Headers, stream, max_files: int, max_file_bytes: int):
+        super().__init__(headers, stream, max_files=max_files, max_fields=100)
+        self.max_file_bytes = max_file_bytes
+        self.staged: list[_StagingFile] = []
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is None:
+            return
+        content_type = upload.headers.get("content-type", "")
+        if not content_type.startswith("image/"):
+            raise MultiPartException(f"{upload.filename} is not an image")
+        upload.file.close()  # SpooledTemporaryFile bawaan (masih kosong) diganti file staging
+        upload.file = _StagingFile(upload.filename or "file", self.max_file_bytes)
+        self.staged.append(upload.file)
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _close_all(staged: list[_StagingFile]):
+    for file in staged:
+        file.close()
+
+
+def _discard_all(staged: list[_StagingFile]):
+    for file in staged:
+        file.close()
+        _discard(file.path)
+
+
+def _publish(key: str, temp_path: str):
+    if storage.exists(key):
+        # isi identik sudah tersimpan: pakai ulang, segarkan mtime supaya tidak disapu GC
+        _discard(temp_path)
+        storage.touch(key)
+    else:
+        storage.put(key, temp_path)
+
+
+async def receive_image_uploads(request: Request) -> list[str]:
+    """
+    Baca body multipart request dan simpan semua bagian file; return key blob (urutan sama dengan body).
+    Semua-atau-tidak-sama-sekali: jika satu file gagal, tidak ada yang dipublikasikan.
+    """
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data")
+
+    parser = _StagingMultiPartParser(
+        request.headers, request.stream(),
+        max_files=settings.UPLOAD_MAX_FILES, max_file_bytes=settings.UPLOAD_MAX_FILE_BYTES,
+    )
+    try:
+        await parser.parse()
+        if not parser.staged:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+    except MultiPartException as e:
+        await run_in_threadpool(_discard_all, parser.staged)
+        raise HTTPException(status_code=400, detail=e.message)
+    except BaseException:
+        await run_in_threadpool(_discard_all, parser.staged)
+        raise
+
+    await run_in_threadpool(_close_all, parser.staged)
+    # lokal: rename atomik di filesystem yang sama; S3: objek muncul setelah upload selesai
+    keys = [blob_key(file.digest.hexdigest(), file.filename) for file in parser.staged]
+    for key, file in zip(keys, parser.staged):
+        await run_in_threadpool(_publish, key, file.path)
+    return keys
+
+
+# ==========================================
+# 📏 Batas ukuran body upload (sebelum multipart di-parse)
+# ==========================================
+class UploadSizeLimitMiddleware:
+    """
+    Tolak body multipart yang melebihi UPLOAD_MAX_REQUEST_BYTES.
+
+    Content-Length dicek sebelum body dibaca sama sekali; untuk body tanpa
+    Content-Length (chunked) jumlah byte dihitung saat diterima dan request
+    dihentikan begitu batas terlewati, tanpa menampung body di memori.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in {"POST", "PUT", "PATCH"}:
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/"):
+            return await self.app(scope, receive, send)
+
+        declared = headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            return await self._reject(scope, receive, send)
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise _BodyTooLarge(self.max_bytes)
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                return  # respons layer dalam (mis. 400 parsing body) diganti 413 di bawah
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # bisa terbungkus ExceptionGroup oleh middleware lain; cukup cek flag
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content=ErrorResponse(
+                error={"code": 413, "type": "HTTPException", "message": f"Request body exceeds {self.max_bytes} bytes"}
+            ).model_dump(),
+            headers={"Connection": "close"},
+        )
+        await response(scope, receive, send)
+
+
+class _BodyTooLarge(HTTPException):
+    # HTTPException: FastAPI meneruskannya apa adanya saat parsing form (bukan 400 generik)
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request body exceeds {max_bytes} bytes")
@@ -1,19 +1,27 @@
 import os
+import asyncio
 import logging
 import traceback
-from fastapi import FastAPI, Depends, Request
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-from starlette.middleware.base import BaseHTTPMiddleware
-from logging.handlers import TimedRotatingFileHandler
+from sqlalchemy import text
 from fastapi.exceptions import HTTPException
 
-from app.core.database import SessionLocal, Base, engine
+from app.core.database import Base, engine, async_engine
 from app.core.config import get_settings
-from app.api.routes import auth, users, admin, products, upload
+from app.api.routes import auth, users, admin, products, product_bulk, reservations, upload, metrics
 from app.core.seed import seed_roles
+from app.core.uploads import UploadSizeLimitMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.request_logging import RequestLoggingMiddleware, setup_logging, stop_logging
+from app.core.instrumentation import MetricsMiddleware, start_metrics_flush, stop_metrics_flush
+from app.core.sql_profiler import SQLProfilerMiddleware
+from app.core.images import shutdown_image_pipeline
+from app.core.static_files import UploadStaticFiles
+from app.core.storage import start_storage_gc, stop_storage_gc, storage
+from app.core.stock import start_reservation_sweeper, stop_reservation_sweeper
 from app.schemas.response import ErrorResponse, SuccessResponse
 
 # ==========================================
@@ -24,18 +32,24 @@ settings = get_settings()
 Base.metadata.create_all(bind=engine)  # sementara, nanti diganti Alembic
 
 app = FastAPI(title=settings.PROJECT_NAME)
+app.add_event_handler("shutdown", shutdown_image_pipeline)
+app.add_event_handler("startup", start_storage_gc)
+app.add_event_handler("shutdown", stop_storage_gc)
+app.add_event_handler("startup", start_reservation_sweeper)
+app.add_event_handler("shutdown", stop_reservation_sweeper)
 
 # ==========================================
 # 🧱 Global Error Handlers (SuccessResponse & ErrorResponse)
 # ==========================================
 
-def format_error(code: int, type_: str, message: str) -> JSONResponse:
+def format_error(code: int, type_: str, message: str, headers: dict | None = None) -> JSONResponse:
     """Helper untuk membuat response error standar"""
     return JSONResponse(
         status_code=code,
         content=ErrorResponse(
             error={"code": code, "type": type_, "message": message}
-        ).dict()
+        ).dict(),
+        headers=headers,
     )
 
 @app.exception_handler(IntegrityError)
@@ -44,7 +58,8 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return format_error(exc.status_code, "HTTPException", exc.detail)
+    # header seperti WWW-Authenticate, Retry-After, Content-Range ikut diteruskan
+    return format_error(exc.status_code, "HTTPException", exc.detail, getattr(exc, "headers", None))
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -73,57 +88,49 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 # ==========================================
-# 🧾 Logging setup (rotation)
+# 🗜️ Compression
+# ==========================================
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+        encodings=[e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",") if e.strip()],
+        cache_max_entries=settings.COMPRESSION_CACHE_MAX_ENTRIES,
+        cache_ttl=settings.COMPRESSION_CACHE_TTL_SECONDS,
+    )
+
+# ==========================================
+# 🧾 Logging (QueueListener: file I/O di luar event loop)
 # ==========================================
 ENV = os.getenv("APP_ENV", "development")
-LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-log_file = os.path.join(LOG_DIR, "app.log")
-
-file_handler = TimedRotatingFileHandler(
-    log_file,
-    when="midnight",
-    interval=1,
-    backupCount=7,
-    encoding="utf-8"
-)
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
+setup_logging(ENV, log_dir="logs", queue_size=settings.LOG_QUEUE_SIZE)
+app.add_event_handler("shutdown", stop_logging)
 
-logging.basicConfig(
-    level=logging.INFO if ENV == "development" else logging.WARNING,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[file_handler, logging.StreamHandler()],
+# ==========================================
+# 🧭 Request logging (pure ASGI, body tidak dibaca)
+# ==========================================
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sample_rate=settings.LOG_REQUEST_SAMPLE_RATE,
+    slow_ms=settings.LOG_SLOW_REQUEST_MS,
 )
 
 # ==========================================
-# 🧭 Logging Middleware
+# 🔬 SQL profiler (opt-in per request)
 # ==========================================
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logging.info(f"➡️  {request.method} {request.url.path}")
-        try:
-            if request.method in {"POST", "PUT", "PATCH"}:
-                try:
-                    body = await request.body()
-                    if body:
-                        snippet = (
-                            body.decode("utf-8")[:300]
-                            .replace("\n", "")
-                            .replace("\r", "")
-                        )
-                        logging.info(f"📦 Body: {snippet}")
-                except Exception:
-                    logging.info("📦 Body: <unreadable>")
+if settings.SQL_PROFILER_MODE != "off":
+    app.add_middleware(SQLProfilerMiddleware)
 
-            response = await call_next(request)
-            logging.info(f"⬅️  {response.status_code} {request.method} {request.url.path}")
-            return response
-        except Exception as e:
-            logging.exception(f"💥 Exception on {request.method} {request.url.path}: {e}")
-            raise
+# ==========================================
+# 📈 Metrics (count, latency, in-flight, query DB per route)
+# ==========================================
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.add_event_handler("startup", start_metrics_flush)
+    app.add_event_handler("shutdown", stop_metrics_flush)
 
-app.add_middleware(LoggingMiddleware)
+# Paling luar: body upload yang terlalu besar ditolak sebelum dibaca middleware/route lain
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.UPLOAD_MAX_REQUEST_BYTES)
 
 # ==========================================
 # 🧩 Routers
@@ -131,22 +138,31 @@ app.add_middleware(LoggingMiddleware)
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(admin.router)
+app.include_router(product_bulk.router)  # sebelum products: /products/export vs /{product_id}
 app.include_router(products.router)
+app.include_router(reservations.router)
 app.include_router(upload.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
-# ==========================================
-# 🗃️ Database Dependency
-# ==========================================
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+if settings.UPLOAD_SERVE_MODE == "static" and storage.is_local:
+    # file upload dilayani langsung tanpa route/dependency (POST /upload/image tetap lewat router)
+    app.mount("/upload", UploadStaticFiles(directory=storage.directory), name="uploads")
 
 # ==========================================
 # 🩺 Health check
 # ==========================================
 @app.get("/health", response_model=SuccessResponse)
-def health(db: Session = Depends(get_db)):
-    return SuccessResponse(data={"status": "ok"})
+async def health():
+    """Cek koneksi DB dengan SELECT 1 (timeout singkat); 503 jika gagal."""
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        # timeout mencakup checkout pool + connect, bukan hanya query
+        await asyncio.wait_for(ping(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+    except Exception:
+        logging.exception("Health check: database unavailable")
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return SuccessResponse(data={"status": "ok", "database": "ok"})
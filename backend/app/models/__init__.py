@@ -1,5 +1,6 @@
 from app.models.user import User
 from app.models.role import Role
 from app.models.product import Product
+from app.models.reservation import StockReservation, StockReservationItem
 
-__all__ = ["User", "Role", "Product"]
+__all__ = ["User", "Role", "Product", "StockReservation", "StockReservationItem"]
@@ -1,14 +1,35 @@
-from sqlalchemy import Column, String, Text, Integer, Float, Numeric, DateTime, ForeignKey, ARRAY
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Integer, Float, Numeric, DateTime, ForeignKey, ARRAY, Computed, Index, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred, backref
 import uuid
 from app.core.database import Base
 
+# Konfigurasi 'simple': tanpa stemming bahasa tertentu, cocok untuk nama produk campuran ID/EN
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')"
+)
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # Composite index untuk filter/sort yang di-whitelist di app/core/product_fields.py
+        Index("ix_products_category_status_price", "category", "status", "price"),
+        Index("ix_products_status_created_at", "status", "created_at", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        # Hitung referensi blob gambar (images && ARRAY[...]) untuk GC storage
+        Index("ix_products_images", "images", postgresql_using="gin"),
+        # Key upsert import massal (NULL boleh berulang untuk produk tanpa SKU)
+        Index("ix_products_sku", "sku", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sku = Column(String(100), nullable=True)
     name = Column(String(255), nullable=False)
     category = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
@@ -19,7 +40,15 @@ class Product(Base):
     status = Column(String(50), default="active")
 
     created_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    created_by = relationship("User", backref="products")
+    # Tidak ada response yang memuat pembuat produk; akses tanpa eager load → error, bukan N+1
+    created_by = relationship("User", backref=backref("products", lazy="raise"), lazy="raise_on_sql")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Full-text search: di-maintain Postgres (generated column), tidak ikut di-load secara default
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+
+
+# Index trigram butuh extension pg_trgm (untuk create_all; migrasi membuatnya sendiri)
+event.listen(Product.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text
+import uuid
+from app.core.database import Base
+
+# Status reservasi: active → committed (checkout selesai) | released (dibatalkan) | expired
+RESERVATION_ACTIVE = "active"
+RESERVATION_COMMITTED = "committed"
+RESERVATION_RELEASED = "released"
+RESERVATION_EXPIRED = "expired"
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        # Sweeper hanya memindai reservasi aktif yang lewat waktu
+        Index(
+            "ix_stock_reservations_active_expires_at", "expires_at",
+            postgresql_where=text(f"status = '{RESERVATION_ACTIVE}'"),
+        ),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default=RESERVATION_ACTIVE, server_default=RESERVATION_ACTIVE)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    items = relationship("StockReservationItem", cascade="all, delete-orphan", lazy="selectin")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class StockReservationItem(Base):
+    __tablename__ = "stock_reservation_items"
+    __table_args__ = (CheckConstraint("quantity > 0", name="ck_stock_reservation_items_quantity"),)
+
+    reservation_id = Column(
+        UUID(as_uuid=True), ForeignKey("stock_reservations.id", ondelete="CASCADE"), primary_key=True
+    )
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True, index=True)
+    quantity = Column(Integer, nullable=False)
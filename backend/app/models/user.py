@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 import uuid
 from app.core.database import Base
@@ -12,9 +12,12 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # dinaikkan untuk mencabut semua token yang sudah terbit (klaim `ver`)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     role_id = Column(UUID(as_uuid=True), ForeignKey("roles.id"), nullable=True)
 
-    role = relationship("Role", backref="users")
+    # Lazy load dilarang: muat eksplisit (joinedload / select kolom), jangan diam-diam per akses
+    role = relationship("Role", backref=backref("users", lazy="raise"), lazy="raise_on_sql")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,9 +1,14 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from functools import lru_cache
+from pydantic import BaseModel, Field, computed_field, create_model, field_validator
+from typing import Dict, List, Optional, Union
 from uuid import UUID
 from datetime import datetime
+from app.core.images import variant_urls
+from app.schemas.response import SuccessResponse
+from app.schemas.search import FilterField
 
 class ProductBase(BaseModel):
+    sku: Optional[str] = Field(None, max_length=100)
     name: str
     category: str
     description: Optional[str] = None
@@ -19,8 +24,44 @@ class ProductCreate(ProductBase):
 class ProductUpdate(ProductBase):
     pass
 
+class ProductPatch(BaseModel):
+    """Update parsial: hanya field yang dikirim yang diubah."""
+    sku: Optional[str] = Field(None, max_length=100)
+    name: Optional[str] = Field(None, max_length=255)
+    category: Optional[str] = Field(None, max_length=100)
+    description: Optional[str] = None
+    images: Optional[List[str]] = None
+    stock: Optional[int] = Field(None, ge=0)
+    price: Optional[float] = Field(None, ge=0)
+    discount: Optional[float] = Field(None, ge=0)
+    status: Optional[str] = Field(None, max_length=50)
+
+    # Kolom NOT NULL: boleh tidak dikirim, tapi tidak boleh dikirim sebagai null
+    @field_validator("name", "category", "stock", "price", "status")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+class ProductPatchItem(BaseModel):
+    """Item batch: `id` + field ProductPatch, divalidasi per item (gagal → item invalid, bukan 422 untuk seluruh batch)."""
+    model_config = {
+        "extra": "allow"
+    }
+
+    id: UUID
+
+class ProductBatchUpdate(BaseModel):
+    items: List[ProductPatchItem] = Field(..., min_length=1, max_length=5000)
+
+class ProductFilterUpdate(BaseModel):
+    filters: List[FilterField] = Field(..., min_length=1)  # wajib: tidak ada update seluruh tabel
+    set: ProductPatch
+
 class ProductOut(BaseModel):
     id: UUID
+    sku: Optional[str] = None
     name: str
     category: Optional[str]
     description: Optional[str]
@@ -36,10 +77,80 @@ class ProductOut(BaseModel):
         "from_attributes": True
     }
 
+    @computed_field
+    @property
+    def image_variants(self) -> List[Dict[str, str]]:
+        """URL thumbnail/medium/WebP per gambar (urutan sama dengan `images`)."""
+        return [variant_urls(url) for url in self.images or []]
+
 class ProductListResponse(BaseModel):
     page: int
     limit: int
     total: int
+    total_strategy: str
     pages: int
     items: List[ProductOut]
 
+class ProductCursorListResponse(BaseModel):
+    limit: int
+    total: int
+    total_strategy: str
+    items: List[ProductOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+# 🔹 Envelope bertipe: pydantic-core men-serialize sekali, langsung ke JSON
+class ProductEnvelope(SuccessResponse):
+    data: ProductOut
+
+class ProductListEnvelope(SuccessResponse):
+    data: Union[ProductListResponse, ProductCursorListResponse]
+
+
+# 🔹 Sparse fieldset (`fields=` / view card): model item dibuat per kombinasi field
+class _SparseProduct(BaseModel):
+    model_config = {
+        "from_attributes": True
+    }
+
+class _SparseProductWithVariants(_SparseProduct):
+    images: Optional[List[str]] = Field(None, exclude=True)  # sumber image_variants, tidak ditampilkan
+
+    @computed_field
+    @property
+    def image_variants(self) -> List[Dict[str, str]]:
+        return [variant_urls(url) for url in self.images or []]
+
+
+@lru_cache(maxsize=128)
+def product_item_model(fieldset: tuple[str, ...] | None) -> type[BaseModel]:
+    """Model item untuk fieldset (None = ProductOut lengkap)."""
+    if fieldset is None:
+        return ProductOut
+    base = _SparseProductWithVariants if "image_variants" in fieldset else _SparseProduct
+    fields = {
+        name: (ProductOut.model_fields[name].annotation, ProductOut.model_fields[name])
+        for name in fieldset
+        if name in ProductOut.model_fields
+    }
+    return create_model("ProductFields", __base__=base, **fields)
+
+
+@lru_cache(maxsize=128)
+def _page_models(fieldset: tuple[str, ...] | None) -> tuple[type[BaseModel], type[BaseModel]]:
+    if fieldset is None:
+        return ProductListResponse, ProductCursorListResponse
+    items = (List[product_item_model(fieldset)], ...)
+    return (
+        create_model("ProductFieldsListResponse", __base__=ProductListResponse, items=items),
+        create_model("ProductFieldsCursorListResponse", __base__=ProductCursorListResponse, items=items),
+    )
+
+
+def product_page(page: dict, fieldset: tuple[str, ...] | None = None) -> BaseModel:
+    """Dict hasil `paginate` → model halaman (mode page atau cursor, item sesuai fieldset)."""
+    page_model, cursor_model = _page_models(fieldset)
+    model = cursor_model if "next_cursor" in page else page_model
+    return model.model_validate(page, from_attributes=True)
+
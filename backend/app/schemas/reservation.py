@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import List
+from uuid import UUID
+from datetime import datetime
+from app.core.config import settings
+
+class ReservationItemIn(BaseModel):
+    product_id: UUID
+    quantity: int = Field(..., gt=0)
+
+class ReservationCreate(BaseModel):
+    items: List[ReservationItemIn] = Field(..., min_length=1)
+
+    @field_validator("items")
+    @classmethod
+    def limit_items(cls, items):
+        if len({item.product_id for item in items}) > settings.STOCK_RESERVATION_MAX_ITEMS:
+            raise ValueError(f"At most {settings.STOCK_RESERVATION_MAX_ITEMS} products per reservation")
+        return items
+
+    def quantities(self) -> dict:
+        """Gabungkan product_id yang sama: {product_id: total quantity}."""
+        merged: dict = {}
+        for item in self.items:
+            merged[item.product_id] = merged.get(item.product_id, 0) + item.quantity
+        return merged
+
+class ReservationItemOut(BaseModel):
+    product_id: UUID
+    quantity: int
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class ReservationOut(BaseModel):
+    id: UUID
+    status: str
+    expires_at: datetime
+    items: List[ReservationItemOut]
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    model_config = {
+        "from_attributes": True
+    }
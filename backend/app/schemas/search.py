@@ -2,7 +2,7 @@ from pydantic import BaseModel
 from typing import List, Optional, Any, Union
 
 class SortField(BaseModel):
-    field: str
+    field: str  # nama kolom, atau "relevance" (skor full-text, butuh `search`)
     direction: str = "asc"  # asc | desc
 
 class SearchField(BaseModel):
@@ -17,6 +17,11 @@ class FilterField(BaseModel):
 class ProductSearchRequest(BaseModel):
     page: int = 1
     limit: int = 10
+    pagination: str = "page"  # page | cursor
+    cursor: Optional[str] = None
+    count: Optional[str] = None  # exact | cached | estimated (default dari settings)
     sort: Optional[List[SortField]] = None
     search: Optional[SearchField] = None
     filters: Optional[List[FilterField]] = None
+    view: Optional[str] = None  # full | card
+    fields: Optional[List[str]] = None  # sparse fieldset; menimpa `view`
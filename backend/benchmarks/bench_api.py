@@ -0,0 +1,82 @@
+"""
+Load generator sederhana untuk membandingkan requests/sec antar versi backend.
+
+Jalankan server dengan jumlah worker tetap, misalnya:
+
+    uvicorn app.main:app --workers 2 --port 8000
+
+lalu (butuh `pip install httpx`):
+
+    python benchmarks/bench_api.py --url http://localhost:8000 --concurrency 64 --duration 20
+
+Untuk before/after, jalankan script yang sama terhadap commit lama dan baru
+dengan database, data dan jumlah worker yang sama.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import httpx
+
+SCENARIOS = {
+    "list": lambda ids: "/products/?limit=20",
+    "list_deep": lambda ids: f"/products/?limit=20&page={random.randint(1, 50)}",
+    "detail": lambda ids: f"/products/{random.choice(ids)}",
+}
+
+
+async def _worker(client: httpx.AsyncClient, scenario, ids, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        path = scenario(ids)
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(url: str, name: str, concurrency: int, duration: float):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        items = (await client.get("/products/?limit=100")).json()["data"]["items"]
+        ids = [item["id"] for item in items] or ["00000000-0000-0000-0000-000000000000"]
+
+        latencies: list[float] = []
+        errors: list = []
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, SCENARIOS[name], ids, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(
+        f"{name:<10} requests={len(latencies):>7}  rps={len(latencies) / elapsed:>8.1f}  "
+        f"p50={p(0.50):.1f}ms  p99={p(0.99):.1f}ms  mean={statistics.fmean(latencies) * 1000:.1f}ms  "
+        f"errors={len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    for name in names:
+        asyncio.run(run(args.url, name, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Microbenchmark overhead auth per request: verifikasi JWT dengan dan tanpa cache.
+
+Tidak butuh server atau database (DATABASE_URL hanya diisi dummy untuk Settings):
+
+    python benchmarks/bench_jwt.py --iterations 20000 --tokens 50
+
+`--tokens` = jumlah token berbeda yang bergantian dipakai (mensimulasikan
+beberapa client aktif yang masing-masing mengulang bearer token yang sama).
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.core import jwt as jwt_module  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+def _tokens(count: int) -> list[str]:
+    return [
+        jwt_module.create_access_token({"sub": str(uuid.uuid4()), "email": f"u{i}@bench.io", "role": "user", "ver": 0})
+        for i in range(count)
+    ]
+
+
+def _run(tokens: list[str], iterations: int, cache_entries: int) -> float:
+    settings.JWT_VERIFY_CACHE_MAX_ENTRIES = cache_entries
+    jwt_module.clear_token_cache()
+    started = time.perf_counter()
+    for i in range(iterations):
+        assert jwt_module.verify_access_token(tokens[i % len(tokens)]) is not None
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+
+    tokens = _tokens(args.tokens)
+    original = settings.JWT_VERIFY_CACHE_MAX_ENTRIES
+    try:
+        for label, entries in (("uncached", 0), ("cached", max(original, args.tokens))):
+            elapsed = _run(tokens, args.iterations, entries)
+            print(f"{label:<9} {elapsed / args.iterations * 1e6:>8.1f} µs/verify  ({args.iterations} calls, {args.tokens} tokens)")
+        print(jwt_module.token_cache_stats())
+    finally:
+        settings.JWT_VERIFY_CACHE_MAX_ENTRIES = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark serialisasi satu halaman list produk (tanpa HTTP dan DB).
+
+    python benchmarks/bench_serialization.py --items 100 --repeat 500
+
+Membandingkan:
+- legacy: entity ORM → ProductOut.model_validate → jsonable_encoder →
+  SuccessResponse(data=Any) yang divalidasi ulang + di-encode FastAPI → json.dumps
+- typed: Row → envelope bertipe → model_dump_json (satu pass pydantic-core)
+- cached: JSON `data` yang sudah jadi dibungkus envelope (cache hit)
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData  # noqa: E402
+
+from app.core.responses import success_json  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.schemas.product import ProductOut, product_page  # noqa: E402
+from app.schemas.response import SuccessResponse  # noqa: E402
+
+
+def _values(i: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": uuid.uuid4(),
+        "sku": f"SKU-{i:06d}",
+        "name": f"Produk contoh {i}",
+        "category": "fashion",
+        "description": "Deskripsi produk " * 8,
+        "images": [f"/upload/{uuid.uuid4().hex}.jpg", f"/upload/{uuid.uuid4().hex}.png"],
+        "stock": i,
+        "price": Decimal("149900.00"),
+        "discount": 10.0,
+        "status": "active",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _rows(values: list[dict]):
+    """Row SQLAlchemy asli (seperti hasil select(*kolom)), tanpa koneksi DB."""
+    names = list(values[0])
+    return list(IteratorResult(SimpleResultMetaData(names), iter([tuple(v[n] for n in names) for v in values])))
+
+
+def _page(items, n):
+    return {"page": 1, "limit": n, "total": 10_000, "total_strategy": "exact", "pages": 10_000 // n, "items": items}
+
+
+def legacy(entities, n) -> bytes:
+    data = jsonable_encoder(_page([ProductOut.model_validate(p) for p in entities], n))
+    # response_model=SuccessResponse: validasi ulang + jsonable_encoder oleh FastAPI
+    body = jsonable_encoder(SuccessResponse.model_validate(SuccessResponse(data=data)))
+    return json.dumps(body, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def typed(rows, n) -> bytes:
+    return success_json(product_page(_page(rows, n)).model_dump_json()).body
+
+
+def cached(data_json: str) -> bytes:
+    return success_json(data_json).body
+
+
+def bench(label: str, fn, repeat: int, items: int):
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{label:<8} {per_call * 1000:8.3f} ms/page   {per_call * 1e6 / items * 100:9.1f} µs per 100 items")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    values = [_values(i) for i in range(args.items)]
+    entities = [Product(**v) for v in values]
+    rows = _rows(values)
+    data_json = product_page(_page(rows, args.items)).model_dump_json()
+
+    assert json.loads(legacy(entities, args.items)) == json.loads(typed(rows, args.items))
+
+    base = bench("legacy", lambda: legacy(entities, args.items), args.repeat, args.items)
+    new = bench("typed", lambda: typed(rows, args.items), args.repeat, args.items)
+    hit = bench("cached", lambda: cached(data_json), args.repeat, args.items)
+    print(f"typed speedup  {base / new:.1f}x   cached speedup {base / hit:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Load test reservasi stok: banyak worker berebut satu SKU "panas".
+
+Server dijalankan seperti bench_api.py, lalu (butuh `pip install httpx`):
+
+    python benchmarks/bench_stock.py --url http://localhost:8000 \
+        --email user@example.com --password secret --stock 500 --concurrency 64
+
+Script membuat satu produk dengan stok `--stock`, lalu semua worker terus
+me-reserve `--quantity` unit sampai stok habis (409). Di akhir dicek:
+jumlah unit yang berhasil di-reserve == stok awal dan stok akhir == 0
+(tidak oversell, tidak ada update yang hilang). Dengan `--multi`, tiap
+reservasi juga mengambil produk kedua dalam urutan acak untuk menguji
+lock order (deadlock akan muncul sebagai error 500).
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import httpx
+
+
+async def _create_product(client: httpx.AsyncClient, stock: int) -> str:
+    response = await client.post("/products/", json={
+        "sku": f"BENCH-STOCK-{uuid.uuid4().hex[:12]}",
+        "name": "Bench hot SKU",
+        "category": "bench",
+        "stock": stock,
+        "price": 1,
+    })
+    response.raise_for_status()
+    return response.json()["data"]["id"]
+
+
+async def _worker(client, product_ids, quantity, multi, reserved: list, latencies: list, errors: list):
+    while True:
+        items = [{"product_id": product_ids[0], "quantity": quantity}]
+        if multi:
+            items.append({"product_id": product_ids[1], "quantity": 1})
+            random.shuffle(items)
+        started = time.perf_counter()
+        try:
+            response = await client.post("/reservations/", json={"items": items})
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status_code == 201:
+            reserved.append(quantity)
+        elif response.status_code == 409:
+            return  # stok habis
+        else:
+            errors.append(response.status_code)
+            if len(errors) > 100:
+                return
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        login = await client.post("/auth/login", json={"email": args.email, "password": args.password})
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['data']['access_token']}"
+
+        product_ids = [await _create_product(client, args.stock)]
+        if args.multi:
+            # stok produk kedua berlebih: yang habis tetap SKU panas
+            product_ids.append(await _create_product(client, args.stock * 10))
+
+        reserved: list[int] = []
+        latencies: list[float] = []
+        errors: list = []
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, product_ids, args.quantity, args.multi, reserved, latencies, errors)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+        # tunggu cache detail in-process worker lain kedaluwarsa (RESPONSE_CACHE_LOCAL_TTL_SECONDS)
+        await asyncio.sleep(args.settle)
+        final_stock = (await client.get(f"/products/{product_ids[0]}")).json()["data"]["stock"]
+
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    units = sum(reserved)
+    print(f"initial stock     {args.stock}")
+    print(f"reserved units    {units} in {len(reserved)} reservations")
+    print(f"final stock       {final_stock}")
+    print(f"requests          {len(latencies)}  errors {len(errors)} {sorted(set(map(str, errors)))[:5]}")
+    print(f"throughput        {len(reserved) / elapsed:.1f} reservations/s")
+    print(f"latency ms        p50={p(0.50):.1f} p95={p(0.95):.1f} p99={p(0.99):.1f}")
+
+    oversold = units > args.stock or final_stock < 0
+    consistent = units + final_stock == args.stock
+    print("RESULT            " + ("OK" if consistent and not oversold and not errors else "FAIL"))
+    return 0 if consistent and not oversold and not errors else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--stock", type=int, default=500)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--settle", type=float, default=6, help="detik menunggu sebelum membaca stok akhir")
+    parser.add_argument("--multi", action="store_true", help="reservasi 2 produk dalam urutan acak")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()